@@ -1,95 +1,279 @@
 """
 Build script for creating executable from Dock Management System
-Usage: python build_exe.py
+Usage: python build_exe.py [--clean] [--models-only]
+  --clean        Remove build/ and force PyInstaller to discard its cache (full rebuild)
+  --models-only  Only refresh models/ in an existing build (changed files are copied)
 """
 import os
 import sys
+import argparse
 import subprocess
 import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import version, PackageNotFoundError
+
+# Output folder created by build_exe.spec (COLLECT name)
+DIST_DIR = os.path.join('dist', 'DockManagementSystem')
+
+# Project-local PyInstaller config/cache directory
+PYINSTALLER_CACHE_DIR = '.pyinstaller_cache'
+
+# Buffer size for user-space file copies (model weights are hundreds of MB)
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _buffered_copy(src, dst):
+    """Copy file contents using a large buffer to cut read/write syscalls"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+
+
+def fast_copy_file(src, dst):
+    """
+    Copy a single file, letting the kernel move the data where possible
+    Uses os.copy_file_range on Linux (reflink on CoW filesystems),
+    falls back to a 1 MB buffered copy elsewhere
+    """
+    if hasattr(os, 'copy_file_range'):
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                remaining = os.fstat(src_fd).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            finally:
+                os.close(dst_fd)
+        except OSError:
+            # Cross-device or unsupported filesystem - use the portable path
+            _buffered_copy(src, dst)
+        finally:
+            os.close(src_fd)
+    else:
+        _buffered_copy(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+
+def needs_copy(src, dst):
+    """Check whether dst is missing, older than src, or a different size"""
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src)
+    return src_stat.st_mtime > dst_stat.st_mtime or src_stat.st_size != dst_stat.st_size
+
+
+def copy_tree_parallel(src, dst):
+    """
+    Copy a directory tree, copying changed files concurrently
+    Files whose destination already matches (same size, not older) are skipped
+    Args:
+        src: Source directory
+        dst: Destination directory (created if missing)
+    Returns:
+        tuple: (files_copied, files_skipped)
+    """
+    jobs = []
+    skipped = 0
+    for root, _dirs, files in os.walk(src):
+        target_dir = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target_dir, exist_ok=True)
+        for name in files:
+            src_file = os.path.join(root, name)
+            dst_file = os.path.join(target_dir, name)
+            if needs_copy(src_file, dst_file):
+                jobs.append((src_file, dst_file))
+            else:
+                skipped += 1
+    
+    if jobs:
+        max_workers = min(8, os.cpu_count() or 1, len(jobs))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fast_copy_file, s, d) for s, d in jobs]
+            for future in futures:
+                future.result()  # Re-raise any copy error
+    return len(jobs), skipped
+
+
+def copy_models(dist_dir):
+    """Copy models/ next to the executable (kept external), skipping unchanged files"""
+    models_src = 'models'
+    models_dest = os.path.join(dist_dir, 'models')
+    if not os.path.exists(models_src):
+        print(f"  ⚠ {models_src}/ directory not found (models must be placed manually)")
+        return
+    try:
+        copied, skipped = copy_tree_parallel(models_src, models_dest)
+        print(f"  ✓ Copied {models_src}/ directory ({copied} updated, {skipped} unchanged)")
+    except Exception as e:
+        print(f"  ⚠ Could not copy {models_src}/: {e}")
+
+
+def get_build_env():
+    """Get environment for the PyInstaller subprocess (wraps compilers with ccache if available)"""
+    env = os.environ.copy()
+    # Keep PyInstaller's bootloader/binary cache with the project so it survives
+    # across invocations and can be cached by CI (an explicit setting wins)
+    env.setdefault('PYINSTALLER_CONFIG_DIR', os.path.abspath(PYINSTALLER_CACHE_DIR))
+    if shutil.which('ccache'):
+        # Native shims rebuilt by PyInstaller hooks hit the compiler cache when unchanged
+        env['CC'] = 'ccache ' + (shutil.which('cc') or 'gcc')
+        env['CXX'] = 'ccache ' + (shutil.which('c++') or 'g++')
+        env['CCACHE_COMPILERCHECK'] = 'content'
+    return env
+
+
+def run_streamed(cmd, env=None, flush_every=50):
+    """
+    Run a command, streaming its combined stdout/stderr through a pipe
+    The child never blocks on a slow console; output is flushed in batches
+    Raises:
+        subprocess.CalledProcessError: If the command exits with non-zero status
+    """
+    process = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, bufsize=1 << 16)
+    out = sys.stdout.buffer
+    line_count = 0
+    for line in iter(process.stdout.readline, b''):
+        out.write(line)
+        line_count += 1
+        if line_count % flush_every == 0:
+            out.flush()
+    out.flush()
+    process.stdout.close()
+    returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    return returncode
+
+
+def get_work_path():
+    """
+    Get PyInstaller work directory keyed by Python version and requirements hash
+    Each dependency set keeps its own analysis cache, so switching between
+    environments does not force torch/ultralytics/opencv to be re-analysed
+    """
+    digest = hashlib.sha256()
+    try:
+        with open('requirements.txt', 'rb') as f:
+            digest.update(f.read())
+    except OSError:
+        pass
+    tag = f"py{sys.version_info.major}{sys.version_info.minor}-{digest.hexdigest()[:16]}"
+    return os.path.join('build', tag)
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Build Dock Management System executable")
+    parser.add_argument('--clean', action='store_true',
+                        help="Remove build/ and discard PyInstaller cache for a full rebuild")
+    parser.add_argument('--models-only', action='store_true',
+                        help="Skip PyInstaller and only refresh models/ in an existing build")
+    args = parser.parse_args()
+    
+    # Let the OS coalesce console writes; each phase flushes explicitly
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
     print("=" * 60)
     print("Dock Management System - Executable Builder")
     print("=" * 60)
     
-    # Check if PyInstaller is installed
+    if args.models_only:
+        if not os.path.exists(DIST_DIR):
+            print(f"\n❌ {DIST_DIR} not found. Run a full build first.")
+            return 1
+        print("\nRefreshing models directory (external)...")
+        copy_models(DIST_DIR)
+        sys.stdout.flush()
+        return 0
+    
+    # Check if PyInstaller is installed (metadata lookup, no package import needed)
     try:
-        import PyInstaller
-        print(f"✓ PyInstaller found: {PyInstaller.__version__}")
-    except ImportError:
+        print(f"✓ PyInstaller found: {version('pyinstaller')}")
+    except PackageNotFoundError:
         print("\n❌ PyInstaller is not installed.")
         print("Please install it using: pip install pyinstaller")
         return 1
     
-    # Check if required files exist
-    if not os.path.exists('main.py'):
+    # Check if required files exist (single directory scan instead of one stat per file)
+    with os.scandir('.') as entries:
+        project_files = {entry.name for entry in entries}
+    
+    if 'main.py' not in project_files:
         print("\n❌ main.py not found. Please run this script from the project root.")
         return 1
     
-    if not os.path.exists('build_exe.spec'):
+    if 'build_exe.spec' not in project_files:
         print("\n❌ build_exe.spec not found. Please ensure the spec file exists.")
         return 1
     
     # Clean previous builds
+    # build/ holds PyInstaller's analysis cache and is only removed for a full rebuild
     print("\nCleaning previous builds...")
-    for folder in ['build', 'dist']:
-        if os.path.exists(folder):
-            try:
-                shutil.rmtree(folder)
-                print(f"  ✓ Removed {folder}/")
-            except Exception as e:
-                print(f"  ⚠ Could not remove {folder}/: {e}")
+    folders_to_clean = ['build', 'dist'] if args.clean else ['dist']
+    for folder in folders_to_clean:
+        if folder not in project_files:
+            continue
+        try:
+            shutil.rmtree(folder)
+            print(f"  ✓ Removed {folder}/")
+        except Exception as e:
+            print(f"  ⚠ Could not remove {folder}/: {e}")
     
     # Build the executable
-    print("\nBuilding executable...")
-    print("This may take several minutes...\n")
+    print("\nBuilding executable...\nThis may take several minutes...\n")
     
     try:
         # Run PyInstaller with the spec file
-        result = subprocess.run(
-            [sys.executable, '-m', 'PyInstaller', 'build_exe.spec', '--clean'],
-            check=True,
-            capture_output=False
-        )
+        # Without --clean, PyInstaller reuses its cached analysis for unchanged dependencies
+        pyinstaller_cmd = [sys.executable, '-m', 'PyInstaller', 'build_exe.spec', '--noconfirm',
+                           '--workpath', get_work_path()]
+        if args.clean:
+            pyinstaller_cmd.append('--clean')
+        sys.stdout.flush()  # Keep our own output ordered before the child's
+        run_streamed(pyinstaller_cmd, env=get_build_env())
         
         # Copy models directory to dist directory (keep it external)
         print("\nCopying models directory (external)...")
-        dist_dir = os.path.join('dist', 'DockManagementSystem')
-        
-        if os.path.exists(dist_dir):
-            # Copy models directory (keep it external)
-            models_src = 'models'
-            models_dest = os.path.join(dist_dir, 'models')
-            if os.path.exists(models_src):
-                try:
-                    if os.path.exists(models_dest):
-                        shutil.rmtree(models_dest)
-                    shutil.copytree(models_src, models_dest)
-                    print(f"  ✓ Copied {models_src}/ directory")
-                except Exception as e:
-                    print(f"  ⚠ Could not copy {models_src}/: {e}")
-            else:
-                print(f"  ⚠ {models_src}/ directory not found (models must be placed manually)")
+        if os.path.exists(DIST_DIR):
+            copy_models(DIST_DIR)
         
-        print("\n" + "=" * 60)
-        print("✓ Build completed successfully!")
-        print("=" * 60)
-        print(f"\nExecutable location: dist/DockManagementSystem/DockManagementSystem.exe")
-        print("\nExternal files (editable, in exe directory):")
-        print("  - models/ (directory with model files)")
-        print("\nBundled in exe:")
-        print("  - config.py (bundled, not external)")
-        print("  - zone_config.json (bundled, not external)")
-        print("  - settings.json (bundled, not external)")
-        print("  - All libraries (torch, ultralytics, opencv, etc.)")
-        print("\nAuto-created files (in exe directory):")
-        print("  - license_cache.json (created automatically)")
-        print("\nNote:")
-        print("  - The entire 'dist/DockManagementSystem' folder contains your application")
-        print("  - Copy the entire folder to distribute your application")
-        print("  - Only models/ folder is external and can be replaced without rebuilding")
-        print("  - All libraries are bundled in the exe (no separate installation needed)")
-        print("\nTo run: dist/DockManagementSystem/DockManagementSystem.exe")
+        print("\n".join([
+            "",
+            "=" * 60,
+            "✓ Build completed successfully!",
+            "=" * 60,
+            "",
+            "Executable location: dist/DockManagementSystem/DockManagementSystem.exe",
+            "",
+            "External files (editable, in exe directory):",
+            "  - models/ (directory with model files)",
+            "",
+            "Bundled in exe:",
+            "  - config.py (bundled, not external)",
+            "  - zone_config.json (bundled, not external)",
+            "  - settings.json (bundled, not external)",
+            "  - All libraries (torch, ultralytics, opencv, etc.)",
+            "",
+            "Auto-created files (in exe directory):",
+            "  - license_cache.json (created automatically)",
+            "",
+            "Note:",
+            "  - The entire 'dist/DockManagementSystem' folder contains your application",
+            "  - Copy the entire folder to distribute your application",
+            "  - Only models/ folder is external and can be replaced without rebuilding",
+            "  - All libraries are bundled in the exe (no separate installation needed)",
+            "",
+            "To run: dist/DockManagementSystem/DockManagementSystem.exe",
+        ]))
+        sys.stdout.flush()
         
         return 0
         
@@ -118,19 +118,17 @@ try:
 except:
     pass
 
-# Collect torch.hub cache data if it exists (YOLOv5 models cache)
-try:
-    import torch
-    hub_cache = os.path.join(os.path.expanduser('~'), '.cache', 'torch', 'hub')
-    if os.path.exists(hub_cache):
-        # Collect ultralytics/yolov5 from hub cache if it exists
-        yolov5_hub_path = os.path.join(hub_cache, 'ultralytics_yolov5_master')
-        if os.path.exists(yolov5_hub_path):
-            # This helps if torch.hub has already downloaded YOLOv5
-            # Note: torch.hub will download at runtime if needed, but having this helps
-            pass
-except:
-    pass
+# Optional inference runtimes (USE_TENSORRT / USE_OPENVINO) - bundled only when installed
+for runtime in ('tensorrt', 'openvino'):
+    try:
+        __import__(runtime)
+        hiddenimports.extend(collect_submodules(runtime))
+        datas += collect_data_files(runtime)
+        print(f"✓ Collected optional runtime: {runtime}")
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"⚠ Warning: Could not collect {runtime}: {e}")
 
 # Collect tkinter data files (if any)
 try:
@@ -188,6 +186,9 @@ try:
 except Exception as e:
     print(f"Warning during build-time imports: {e}")
 
+# Drop duplicate hidden imports (explicit list overlaps the collected submodules)
+hiddenimports = list(dict.fromkeys(hiddenimports))
+
 # Analyze the main script
 # Config files are bundled in the exe
 a = Analysis(
@@ -4,41 +4,58 @@ Configuration file for Dock Management System
 import os
 import json
 import sys
+import copy
+import functools
+import threading
+
+# Use orjson when available (C implementation), stdlib json otherwise
+# Both helpers work on bytes so files are opened in binary mode
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
 
 # Get base directory - works for both development and PyInstaller executable
+@functools.lru_cache(maxsize=None)
 def get_base_dir():
-    """Get the base directory for the application"""
+    """Get the base directory for the application (computed once per process)"""
     if getattr(sys, 'frozen', False):
         # Running as compiled executable
         # PyInstaller creates a temp folder and stores path in _MEIPASS
         # For user files (config, models), use the executable's directory
-        if hasattr(sys, '_MEIPASS'):
-            # Onefile mode - use executable directory
-            return os.path.dirname(sys.executable)
-        else:
-            # Directory mode - use executable directory
-            return os.path.dirname(sys.executable)
+        # (same for onefile and directory mode)
+        return os.path.dirname(sys.executable)
     else:
         # Running as script
         return os.path.dirname(os.path.abspath(__file__))
 
 BASE_DIR = get_base_dir()
 
+@functools.lru_cache(maxsize=32)
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and PyInstaller"""
-    if getattr(sys, 'frozen', False):
-        # PyInstaller: use executable directory for user-editable files
-        base_path = os.path.dirname(sys.executable)
-    else:
-        # Development: use script directory
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base_path, relative_path)
+    # PyInstaller: executable directory for user-editable files; development: script directory
+    return os.path.join(BASE_DIR, relative_path)
 
 # Model Configuration
 MODEL_PATH = "models/best_doc4.pt"  # Path to your YOLO custom model (relative to BASE_DIR)
 CONFIDENCE_THRESHOLD = 0.5  # Detection confidence threshold
+NMS_IOU_THRESHOLD = 0.45  # Overlap (IoU) above which NMS merges boxes of the same class
+MAX_DETECTIONS = 50  # Max boxes kept per frame after NMS (a dock scene has far fewer)
 USE_GPU = True  # Use GPU (CUDA) if available, fallback to CPU if not
 DEVICE = None  # Auto-detect: 'cuda' or 'cpu' (None = auto)
+USE_TENSORRT = False  # On GPU, export the .pt model to a TensorRT engine once (next to the .pt) and run that instead
+USE_OPENVINO = False  # On CPU, export the .pt model to OpenVINO once (next to the .pt) and run that instead
+MODEL_PRECISION = 'fp32'  # GPU inference precision of the PyTorch model: 'fp32' or 'fp16' (faster, slightly different scores)
+TENSORRT_PRECISION = 'fp16'  # Precision of the exported TensorRT engine (USE_TENSORRT): 'fp16' or 'fp32'
+USE_CUDA_GRAPHS = False  # On GPU with the .pt model, replay the network as a captured CUDA graph (one per input shape)
 
 # Class IDs (based on your YOLO model classes)
 CLASS_IDS = {
@@ -46,13 +63,18 @@ CLASS_IDS = {
     'forklift': 1,   # Class 1 is forklift (ignored)
     'truck': 2       # Class 2 is truck
 }
+# Same IDs as plain ints for the per-detection comparisons in the detector
+PERSON_CLASS_ID = CLASS_IDS['person']
+FORKLIFT_CLASS_ID = CLASS_IDS['forklift']
+TRUCK_CLASS_ID = CLASS_IDS['truck']
 
 # Zone Configuration File
 ZONE_CONFIG_FILE = "zone_config.json"  # Relative to BASE_DIR
+ZONE_CONFIG_PATH = get_resource_path(ZONE_CONFIG_FILE)
 
 # Zone Configuration (loaded from JSON or set manually)
-ZONE_COORDINATES = None  # Will be loaded from JSON or set manually
-PARKING_LINE_POINTS = None  # Will be loaded from JSON or set manually
+# ZONE_COORDINATES and PARKING_LINE_POINTS are loaded lazily on first access (see __getattr__)
+_ZONE_CONFIG_ATTRS = ('ZONE_COORDINATES', 'PARKING_LINE_POINTS')
 PARKING_LINE_WAIT_TIME = 10  # Wait time in seconds before turning green after truck touches parking line
 PARKING_LINE_GRACE_PERIOD = 50  # Number of consecutive "not touching" detections before resetting timer (prevents timer reset due to frame skipping or detection flicker)
 
@@ -65,33 +87,92 @@ HUMAN_ZONE_CHECK_POINTS = {
     'bottom_left': True,   # Check bottom-left corner (x1, y2)
     'center': True         # Check center point ((x1+x2)/2, (y1+y2)/2)
 }
+# Order of check points (also used by dock_utils.helpers for index tuples and bitmasks)
+HUMAN_ZONE_CHECK_POINT_ORDER = ('top_left', 'top_right', 'bottom_right', 'bottom_left', 'center')
+
+def get_check_point_indices(check_points_config):
+    """Convert a check points dict into a tuple of enabled indices (all if none enabled)"""
+    indices = tuple(i for i, name in enumerate(HUMAN_ZONE_CHECK_POINT_ORDER)
+                    if check_points_config.get(name, False))
+    return indices or tuple(range(len(HUMAN_ZONE_CHECK_POINT_ORDER)))
+
+# Enabled HUMAN_ZONE_CHECK_POINTS as a bitmask (bit i = HUMAN_ZONE_CHECK_POINT_ORDER[i], refreshed whenever settings change)
+HUMAN_ZONE_CHECK_MASK = sum(1 << i for i in get_check_point_indices(HUMAN_ZONE_CHECK_POINTS))
+
+def _read_file_bytes(path):
+    """Read a whole file as bytes via a raw file descriptor (no text decoding or buffering layer)"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        remaining = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(remaining, 4096))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+def _write_file_atomic(path, data):
+    """Write bytes to a temp file and swap it in, so readers never see a partial file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# Parsed JSON files: path -> ((st_mtime_ns, st_size), data)
+_json_file_cache = {}
+
+def _load_json_cached(path):
+    """
+    Load a JSON file, reusing the parsed data while the file is unchanged
+    Returns a copy each time, so callers can modify the result without affecting later loads
+    Raises:
+        OSError: If the file cannot be read (FileNotFoundError if missing)
+        ValueError: If the file is not valid JSON
+    """
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _json_file_cache.get(path)
+    if cached is None or cached[0] != key:
+        cached = _json_file_cache[path] = (key, _json_loads(_read_file_bytes(path)))
+    return copy.deepcopy(cached[1])
 
 # Load zone configuration from JSON if it exists
 def load_zone_config():
     """Load zone and parking line configuration from JSON file"""
     global ZONE_COORDINATES, PARKING_LINE_POINTS
-    zone_config_path = get_resource_path(ZONE_CONFIG_FILE)
-    if os.path.exists(zone_config_path):
-        try:
-            with open(zone_config_path, 'r') as f:
-                config_data = json.load(f)
-                # Convert lists to tuples for zone coordinates
-                zone_data = config_data.get('zone_coordinates')
-                if zone_data:
-                    ZONE_COORDINATES = [tuple(point) if isinstance(point, list) else point for point in zone_data]
-                # Convert lists to tuples for parking line points
-                line_data = config_data.get('parking_line_points')
-                if line_data:
-                    PARKING_LINE_POINTS = [tuple(point) if isinstance(point, list) else point for point in line_data]
-                if ZONE_COORDINATES or PARKING_LINE_POINTS:
-                    print(f"Loaded zone configuration from {zone_config_path}")
-                    return True
-        except Exception as e:
-            print(f"Warning: Could not load zone config from {zone_config_path}: {e}")
+    # Define defaults on first load so __getattr__ is no longer consulted
+    for name in _ZONE_CONFIG_ATTRS:
+        globals().setdefault(name, None)
+    zone_config_path = ZONE_CONFIG_PATH
+    try:
+        config_data = _load_json_cached(zone_config_path)
+        # Convert lists to tuples for zone coordinates
+        zone_data = config_data.get('zone_coordinates')
+        if zone_data:
+            ZONE_COORDINATES = list(map(tuple, zone_data))
+        # Convert lists to tuples for parking line points
+        line_data = config_data.get('parking_line_points')
+        if line_data:
+            PARKING_LINE_POINTS = list(map(tuple, line_data))
+        if ZONE_COORDINATES or PARKING_LINE_POINTS:
+            print(f"Loaded zone configuration from {zone_config_path}")
+            return True
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not load zone config from {zone_config_path}: {e}")
     return False
 
-# Auto-load on import
-load_zone_config()
+def __getattr__(name):
+    """Load zone configuration on first access instead of at import time"""
+    if name in _ZONE_CONFIG_ATTRS:
+        load_zone_config()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # UI Configuration
 WINDOW_WIDTH = 1400
@@ -129,6 +210,7 @@ ENABLE_API_CALLS = True  # Enable/disable API calls
 # Dock Status API Configuration
 DOCK_STATUS_API_URL = "http://127.0.0.1:3041/dock1/status"  # API endpoint for dock status updates
 ENABLE_DOCK_STATUS_API = True  # Enable/disable dock status API calls
+DOCK_STATUS_COALESCE_WINDOW = 0.2  # Seconds to wait before posting a status; state changes within the window send only the latest
 
 # PLC Configuration (Modbus TCP)
 ENABLE_PLC = True  # Enable/disable PLC control
@@ -137,114 +219,164 @@ PLC_PORT = 502  # PLC Modbus TCP port
 PLC_AUTO_OPEN = True  # Automatically open connection on initialization
 PLC_AUTO_CLOSE = True  # Automatically close connection on shutdown
 PLC_COIL_START_ADDRESS = 0  # Starting address for coils (adjust based on your PLC)
-# Coil configurations: [coil0, coil1, coil2, coil3, coil4, coil5, coil6, coil7]
-PLC_GREEN_LIGHT_COILS = [True, False, False, False, False, False, False, False]
-PLC_RED_LIGHT_COILS = [False, True, False, False, False, False, False, False]
-PLC_YELLOW_LIGHT_COILS = [False, False, True, False, False, False, False, False]
+PLC_COIL_COUNT = 8  # Number of coils written per state change
+# Coil bitmasks: bit N drives coil N
+PLC_GREEN_LIGHT_MASK = 0x01   # coil0
+PLC_RED_LIGHT_MASK = 0x02     # coil1
+PLC_YELLOW_LIGHT_MASK = 0x04  # coil2
+
+def mask_to_coils(mask, count=PLC_COIL_COUNT):
+    """Expand a coil bitmask into a [coil0, ..., coilN] list of bools"""
+    return [bool(mask >> i & 1) for i in range(count)]
+
+def coils_to_mask(coils):
+    """Pack a [coil0, ..., coilN] list of bools into a bitmask"""
+    mask = 0
+    for i, value in enumerate(coils):
+        if value:
+            mask |= 1 << i
+    return mask
+
+# Coil configurations: (coil0, coil1, coil2, coil3, coil4, coil5, coil6, coil7)
+# (sequence form is what settings.json and the Settings dialog use; kept as read-only tuples)
+PLC_GREEN_LIGHT_COILS = tuple(mask_to_coils(PLC_GREEN_LIGHT_MASK))
+PLC_RED_LIGHT_COILS = tuple(mask_to_coils(PLC_RED_LIGHT_MASK))
+PLC_YELLOW_LIGHT_COILS = tuple(mask_to_coils(PLC_YELLOW_LIGHT_MASK))
 
 # Settings Configuration File
 SETTINGS_FILE = "settings.json"  # Relative to BASE_DIR
+SETTINGS_PATH = get_resource_path(SETTINGS_FILE)
+
+def _keep(value):
+    return value
+
+def _to_bool(value):
+    """bool() that also understands 'true'/'false' style strings"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+def _none_if_empty(value):
+    return value if value else None
+
+def _resolve_path(value):
+    """Resolve relative paths relative to base directory"""
+    return value if os.path.isabs(value) else get_resource_path(value)
+
+# Settings keys: settings.json key -> (config variable, coercer)
+_SETTINGS_SPEC = {
+    'video_source': ('VIDEO_SOURCE', _keep),
+    'model_path': ('MODEL_PATH', _resolve_path),
+    'confidence_threshold': ('CONFIDENCE_THRESHOLD', float),
+    'nms_iou_threshold': ('NMS_IOU_THRESHOLD', float),
+    'max_detections': ('MAX_DETECTIONS', int),
+    'use_gpu': ('USE_GPU', _to_bool),
+    'use_tensorrt': ('USE_TENSORRT', _to_bool),
+    'use_openvino': ('USE_OPENVINO', _to_bool),
+    'model_precision': ('MODEL_PRECISION', str),
+    'tensorrt_precision': ('TENSORRT_PRECISION', str),
+    'use_cuda_graphs': ('USE_CUDA_GRAPHS', _to_bool),
+    'license_key': ('LICENSE_KEY', _none_if_empty),
+    'yellow_api_url': ('YELLOW_API_URL', _keep),
+    'red_api_url': ('RED_API_URL', _keep),
+    'stop_api_url': ('STOP_API_URL', _keep),
+    'successfully_parked_api_url': ('SUCCESSFULLY_PARKED_API_URL', _keep),
+    'enable_api_calls': ('ENABLE_API_CALLS', _to_bool),
+    'dock_status_api_url': ('DOCK_STATUS_API_URL', _keep),
+    'enable_dock_status_api': ('ENABLE_DOCK_STATUS_API', _to_bool),
+    'dock_status_coalesce_window': ('DOCK_STATUS_COALESCE_WINDOW', float),
+    'enable_plc': ('ENABLE_PLC', _to_bool),
+    'plc_host': ('PLC_HOST', _keep),
+    'plc_port': ('PLC_PORT', int),
+    'plc_green_coils': ('PLC_GREEN_LIGHT_COILS', tuple),
+    'plc_red_coils': ('PLC_RED_LIGHT_COILS', tuple),
+    'plc_yellow_coils': ('PLC_YELLOW_LIGHT_COILS', tuple),
+    'parking_line_wait_time': ('PARKING_LINE_WAIT_TIME', int),
+    'parking_line_grace_period': ('PARKING_LINE_GRACE_PERIOD', int),
+    'batch_size': ('BATCH_SIZE', int),
+    'batch_timeout': ('BATCH_TIMEOUT', float),
+    'enable_batch_processing': ('ENABLE_BATCH_PROCESSING', _to_bool),
+    'enable_multithreading': ('ENABLE_MULTITHREADING', _to_bool),
+    'frame_skip': ('FRAME_SKIP', int),
+    'show_license_expiry': ('SHOW_LICENSE_EXPIRY', _to_bool),
+    'human_zone_check_points': ('HUMAN_ZONE_CHECK_POINTS', _keep),
+}
+
+def _apply_settings(settings):
+    """Copy known keys from a settings dictionary into the config variables"""
+    config_vars = globals()
+    for key, value in settings.items():
+        spec = _SETTINGS_SPEC.get(key)
+        if spec is not None:
+            name, coerce = spec
+            try:
+                config_vars[name] = coerce(value)
+            except (TypeError, ValueError):
+                # Keep the current value rather than dropping the whole settings file
+                print(f"Warning: Invalid value for setting '{key}': {value!r}")
+    _refresh_derived_settings()
+
+def _refresh_derived_settings():
+    """Recompute values derived from settings (PLC coil bitmasks, human check points)"""
+    global PLC_GREEN_LIGHT_MASK, PLC_RED_LIGHT_MASK, PLC_YELLOW_LIGHT_MASK
+    global HUMAN_ZONE_CHECK_MASK
+    PLC_GREEN_LIGHT_MASK = coils_to_mask(PLC_GREEN_LIGHT_COILS)
+    PLC_RED_LIGHT_MASK = coils_to_mask(PLC_RED_LIGHT_COILS)
+    PLC_YELLOW_LIGHT_MASK = coils_to_mask(PLC_YELLOW_LIGHT_COILS)
+    HUMAN_ZONE_CHECK_MASK = sum(1 << i for i in get_check_point_indices(HUMAN_ZONE_CHECK_POINTS))
+
+# Encrypted storage module, imported on first use (only needed when frozen)
+_encrypted_storage = None
+_encrypted_storage_thread = None
+
+def _import_encrypted_storage():
+    """Import dock_utils.encrypted_storage (run in a background thread at startup)"""
+    global _encrypted_storage
+    try:
+        from dock_utils import encrypted_storage
+        _encrypted_storage = encrypted_storage
+    except ImportError:
+        # Leave it to _get_encrypted_storage to raise in the caller's thread
+        pass
+
+def _get_encrypted_storage():
+    """Import dock_utils.encrypted_storage once and keep a reference to it"""
+    global _encrypted_storage
+    if _encrypted_storage_thread is not None:
+        # Wait for the startup import if it is still running
+        _encrypted_storage_thread.join()
+    if _encrypted_storage is None:
+        from dock_utils import encrypted_storage
+        _encrypted_storage = encrypted_storage
+    return _encrypted_storage
+
+if getattr(sys, 'frozen', False):
+    # Load cryptography while the rest of the app (torch, cv2) is still importing
+    _encrypted_storage_thread = threading.Thread(target=_import_encrypted_storage, daemon=True)
+    _encrypted_storage_thread.start()
+
+def _read_plain_settings():
+    """Read settings from plain JSON file, or None if missing/unreadable"""
+    # No exists() check first - a missing file just raises FileNotFoundError
+    try:
+        return _load_json_cached(SETTINGS_PATH)
+    except:
+        return None
 
 def load_settings():
     """Load settings from file (encrypted when running as exe)"""
+    settings = None
     if getattr(sys, 'frozen', False):
         # Running as exe - try encrypted storage first
-        from dock_utils.encrypted_storage import load_encrypted_data
-        settings = load_encrypted_data(SETTINGS_FILE)
-        if settings is None:
-            # Fallback to plain JSON if encrypted file doesn't exist (migration)
-            settings_path = get_resource_path(SETTINGS_FILE)
-            if os.path.exists(settings_path):
-                try:
-                    with open(settings_path, 'r') as f:
-                        settings = json.load(f)
-                except:
-                    return False
-            else:
-                return False
-    else:
-        # Development mode - load from plain JSON
-        settings_path = get_resource_path(SETTINGS_FILE)
-        if not os.path.exists(settings_path):
-            return False
-        try:
-            with open(settings_path, 'r') as f:
-                settings = json.load(f)
-        except:
-            return False
+        settings = _get_encrypted_storage().load_encrypted_data(SETTINGS_FILE)
+    if settings is None:
+        # Development mode, or fallback to plain JSON if encrypted file doesn't exist (migration)
+        settings = _read_plain_settings()
     
     if settings:
         try:
             # Update config values from settings file
-            global VIDEO_SOURCE, MODEL_PATH, CONFIDENCE_THRESHOLD, USE_GPU, LICENSE_KEY
-            global YELLOW_API_URL, RED_API_URL, STOP_API_URL, SUCCESSFULLY_PARKED_API_URL, ENABLE_API_CALLS
-            global DOCK_STATUS_API_URL, ENABLE_DOCK_STATUS_API
-            global ENABLE_PLC, PLC_HOST, PLC_PORT
-            global PLC_GREEN_LIGHT_COILS, PLC_RED_LIGHT_COILS, PLC_YELLOW_LIGHT_COILS
-            global PARKING_LINE_WAIT_TIME, PARKING_LINE_GRACE_PERIOD
-            global BATCH_SIZE, BATCH_TIMEOUT, ENABLE_BATCH_PROCESSING
-            global ENABLE_MULTITHREADING, FRAME_SKIP, SHOW_LICENSE_EXPIRY
-            global HUMAN_ZONE_CHECK_POINTS
-            
-            if 'video_source' in settings:
-                VIDEO_SOURCE = settings['video_source']
-            if 'model_path' in settings:
-                model_path = settings['model_path']
-                # Resolve relative paths relative to base directory
-                if not os.path.isabs(model_path):
-                    MODEL_PATH = get_resource_path(model_path)
-                else:
-                    MODEL_PATH = model_path
-            if 'confidence_threshold' in settings:
-                CONFIDENCE_THRESHOLD = float(settings['confidence_threshold'])
-            if 'use_gpu' in settings:
-                USE_GPU = bool(settings['use_gpu'])
-            if 'license_key' in settings:
-                LICENSE_KEY = settings['license_key'] if settings['license_key'] else None
-            if 'yellow_api_url' in settings:
-                YELLOW_API_URL = settings['yellow_api_url']
-            if 'red_api_url' in settings:
-                RED_API_URL = settings['red_api_url']
-            if 'stop_api_url' in settings:
-                STOP_API_URL = settings['stop_api_url']
-            if 'successfully_parked_api_url' in settings:
-                SUCCESSFULLY_PARKED_API_URL = settings['successfully_parked_api_url']
-            if 'enable_api_calls' in settings:
-                ENABLE_API_CALLS = bool(settings['enable_api_calls'])
-            if 'dock_status_api_url' in settings:
-                DOCK_STATUS_API_URL = settings['dock_status_api_url']
-            if 'enable_dock_status_api' in settings:
-                ENABLE_DOCK_STATUS_API = bool(settings['enable_dock_status_api'])
-            if 'enable_plc' in settings:
-                ENABLE_PLC = bool(settings['enable_plc'])
-            if 'plc_host' in settings:
-                PLC_HOST = settings['plc_host']
-            if 'plc_port' in settings:
-                PLC_PORT = int(settings['plc_port'])
-            if 'plc_green_coils' in settings:
-                PLC_GREEN_LIGHT_COILS = settings['plc_green_coils']
-            if 'plc_red_coils' in settings:
-                PLC_RED_LIGHT_COILS = settings['plc_red_coils']
-            if 'plc_yellow_coils' in settings:
-                PLC_YELLOW_LIGHT_COILS = settings['plc_yellow_coils']
-            if 'parking_line_wait_time' in settings:
-                PARKING_LINE_WAIT_TIME = int(settings['parking_line_wait_time'])
-            if 'parking_line_grace_period' in settings:
-                PARKING_LINE_GRACE_PERIOD = int(settings['parking_line_grace_period'])
-            if 'batch_size' in settings:
-                BATCH_SIZE = int(settings['batch_size'])
-            if 'batch_timeout' in settings:
-                BATCH_TIMEOUT = float(settings['batch_timeout'])
-            if 'enable_batch_processing' in settings:
-                ENABLE_BATCH_PROCESSING = bool(settings['enable_batch_processing'])
-            if 'enable_multithreading' in settings:
-                ENABLE_MULTITHREADING = bool(settings['enable_multithreading'])
-            if 'frame_skip' in settings:
-                FRAME_SKIP = int(settings['frame_skip'])
-            if 'show_license_expiry' in settings:
-                SHOW_LICENSE_EXPIRY = bool(settings['show_license_expiry'])
-            if 'human_zone_check_points' in settings:
-                HUMAN_ZONE_CHECK_POINTS = settings['human_zone_check_points']
+            _apply_settings(settings)
             
             if getattr(sys, 'frozen', False):
                 print(f"Settings loaded from encrypted storage")
@@ -258,17 +390,21 @@ def load_settings():
     return False
 
 def save_settings_to_file(settings_dict):
-    """Save settings dictionary to file (encrypted when running as exe)"""
+    """
+    Save settings dictionary to file (encrypted when running as exe)
+    The dictionary is merged over the current settings, so keys the caller does not set
+    (e.g. ones without a field in the settings dialog) keep their values instead of being dropped
+    """
     try:
+        settings_dict = {**get_current_settings(), **settings_dict}
         if getattr(sys, 'frozen', False):
             # Running as exe - use encrypted storage
-            from dock_utils.encrypted_storage import save_encrypted_data
-            return save_encrypted_data(settings_dict, SETTINGS_FILE)
+            return _get_encrypted_storage().save_encrypted_data(settings_dict, SETTINGS_FILE)
         else:
             # Development mode - save as plain JSON
-            settings_path = get_resource_path(SETTINGS_FILE)
-            with open(settings_path, 'w') as f:
-                json.dump(settings_dict, f, indent=4)
+            settings_path = SETTINGS_PATH
+            _write_file_atomic(settings_path, _json_dumps(settings_dict))
+            _json_file_cache.pop(settings_path, None)
             print(f"Settings saved to {settings_path}")
             return True
     except Exception as e:
@@ -280,21 +416,26 @@ def get_current_settings():
     # Load zone config if exists
     zone_coords = None
     parking_line_points = None
-    zone_config_path = get_resource_path(ZONE_CONFIG_FILE)
-    if os.path.exists(zone_config_path):
-        try:
-            with open(zone_config_path, 'r') as f:
-                zone_config = json.load(f)
-                zone_coords = zone_config.get('zone_coordinates', [])
-                parking_line_points = zone_config.get('parking_line_points', [])
-        except:
-            pass
+    zone_config_path = ZONE_CONFIG_PATH
+    try:
+        zone_config = _load_json_cached(zone_config_path)
+        zone_coords = zone_config.get('zone_coordinates', [])
+        parking_line_points = zone_config.get('parking_line_points', [])
+    except Exception:
+        pass
     
     return {
         'video_source': VIDEO_SOURCE,
         'model_path': MODEL_PATH,
         'confidence_threshold': CONFIDENCE_THRESHOLD,
+        'nms_iou_threshold': NMS_IOU_THRESHOLD,
+        'max_detections': MAX_DETECTIONS,
         'use_gpu': USE_GPU,
+        'use_tensorrt': USE_TENSORRT,
+        'use_openvino': USE_OPENVINO,
+        'model_precision': MODEL_PRECISION,
+        'tensorrt_precision': TENSORRT_PRECISION,
+        'use_cuda_graphs': USE_CUDA_GRAPHS,
         'license_key': LICENSE_KEY or '',
         'yellow_api_url': YELLOW_API_URL,
         'red_api_url': RED_API_URL,
@@ -303,6 +444,7 @@ def get_current_settings():
         'enable_api_calls': ENABLE_API_CALLS,
         'dock_status_api_url': DOCK_STATUS_API_URL,
         'enable_dock_status_api': ENABLE_DOCK_STATUS_API,
+        'dock_status_coalesce_window': DOCK_STATUS_COALESCE_WINDOW,
         'enable_plc': ENABLE_PLC,
         'plc_host': PLC_HOST,
         'plc_port': PLC_PORT,
@@ -316,6 +458,7 @@ def get_current_settings():
         'enable_batch_processing': ENABLE_BATCH_PROCESSING,
         'enable_multithreading': ENABLE_MULTITHREADING,
         'frame_skip': FRAME_SKIP,
+        'show_license_expiry': SHOW_LICENSE_EXPIRY,
         'zone_coordinates': zone_coords,
         'parking_line_points': parking_line_points,
         'human_zone_check_points': HUMAN_ZONE_CHECK_POINTS
@@ -323,84 +466,34 @@ def get_current_settings():
 
 def update_settings_from_dict(settings_dict):
     """Update config values from a dictionary (used by settings UI)"""
-    global VIDEO_SOURCE, MODEL_PATH, CONFIDENCE_THRESHOLD, USE_GPU, LICENSE_KEY
-    global YELLOW_API_URL, RED_API_URL, STOP_API_URL, ENABLE_API_CALLS
-    global ENABLE_PLC, PLC_HOST, PLC_PORT
-    global PLC_GREEN_LIGHT_COILS, PLC_RED_LIGHT_COILS, PLC_YELLOW_LIGHT_COILS
-    global PARKING_LINE_WAIT_TIME, PARKING_LINE_GRACE_PERIOD
-    global BATCH_SIZE, BATCH_TIMEOUT, ENABLE_BATCH_PROCESSING
-    global ENABLE_MULTITHREADING, FRAME_SKIP, SHOW_LICENSE_EXPIRY
-    global HUMAN_ZONE_CHECK_POINTS
-    
-    if 'video_source' in settings_dict:
-        VIDEO_SOURCE = settings_dict['video_source']
-    if 'model_path' in settings_dict:
-        MODEL_PATH = settings_dict['model_path']
-    if 'confidence_threshold' in settings_dict:
-        CONFIDENCE_THRESHOLD = float(settings_dict['confidence_threshold'])
-    if 'use_gpu' in settings_dict:
-        USE_GPU = bool(settings_dict['use_gpu'])
-    if 'license_key' in settings_dict:
-        LICENSE_KEY = settings_dict['license_key'] if settings_dict['license_key'] else None
-    if 'yellow_api_url' in settings_dict:
-        YELLOW_API_URL = settings_dict['yellow_api_url']
-    if 'red_api_url' in settings_dict:
-        RED_API_URL = settings_dict['red_api_url']
-    if 'stop_api_url' in settings_dict:
-        STOP_API_URL = settings_dict['stop_api_url']
-    if 'successfully_parked_api_url' in settings_dict:
-        SUCCESSFULLY_PARKED_API_URL = settings_dict['successfully_parked_api_url']
-    if 'enable_api_calls' in settings_dict:
-        ENABLE_API_CALLS = bool(settings_dict['enable_api_calls'])
-    if 'dock_status_api_url' in settings_dict:
-        DOCK_STATUS_API_URL = settings_dict['dock_status_api_url']
-    if 'enable_dock_status_api' in settings_dict:
-        ENABLE_DOCK_STATUS_API = bool(settings_dict['enable_dock_status_api'])
-    if 'enable_plc' in settings_dict:
-        ENABLE_PLC = bool(settings_dict['enable_plc'])
-    if 'plc_host' in settings_dict:
-        PLC_HOST = settings_dict['plc_host']
-    if 'plc_port' in settings_dict:
-        PLC_PORT = int(settings_dict['plc_port'])
-    if 'plc_green_coils' in settings_dict:
-        PLC_GREEN_LIGHT_COILS = settings_dict['plc_green_coils']
-    if 'plc_red_coils' in settings_dict:
-        PLC_RED_LIGHT_COILS = settings_dict['plc_red_coils']
-    if 'plc_yellow_coils' in settings_dict:
-        PLC_YELLOW_LIGHT_COILS = settings_dict['plc_yellow_coils']
-    if 'parking_line_wait_time' in settings_dict:
-        PARKING_LINE_WAIT_TIME = int(settings_dict['parking_line_wait_time'])
-    if 'parking_line_grace_period' in settings_dict:
-        PARKING_LINE_GRACE_PERIOD = int(settings_dict['parking_line_grace_period'])
-    if 'batch_size' in settings_dict:
-        BATCH_SIZE = int(settings_dict['batch_size'])
-    if 'batch_timeout' in settings_dict:
-        BATCH_TIMEOUT = float(settings_dict['batch_timeout'])
-    if 'enable_batch_processing' in settings_dict:
-        ENABLE_BATCH_PROCESSING = bool(settings_dict['enable_batch_processing'])
-    if 'enable_multithreading' in settings_dict:
-        ENABLE_MULTITHREADING = bool(settings_dict['enable_multithreading'])
-    if 'frame_skip' in settings_dict:
-        FRAME_SKIP = int(settings_dict['frame_skip'])
-    if 'show_license_expiry' in settings_dict:
-        SHOW_LICENSE_EXPIRY = bool(settings_dict['show_license_expiry'])
-    if 'human_zone_check_points' in settings_dict:
-        HUMAN_ZONE_CHECK_POINTS = settings_dict['human_zone_check_points']
-    
-    # Save zone configuration if provided
+    _apply_settings(settings_dict)
+    _save_zone_config(settings_dict)
+
+def _as_points(points):
+    """Normalize a point list (lists or tuples) for comparison"""
+    return [tuple(p) for p in points] if points else []
+
+def _save_zone_config(settings_dict):
+    """Write zone/parking line points from a settings dictionary to the zone config file"""
     if 'zone_coordinates' in settings_dict or 'parking_line_points' in settings_dict:
         try:
-            zone_config_path = get_resource_path(ZONE_CONFIG_FILE)
-            zone_config = {}
-            if os.path.exists(zone_config_path):
-                with open(zone_config_path, 'r') as f:
-                    zone_config = json.load(f)
-            if 'zone_coordinates' in settings_dict:
-                zone_config['zone_coordinates'] = settings_dict['zone_coordinates']
-            if 'parking_line_points' in settings_dict:
-                zone_config['parking_line_points'] = settings_dict['parking_line_points']
-            with open(zone_config_path, 'w') as f:
-                json.dump(zone_config, f, indent=4)
+            zone_config_path = ZONE_CONFIG_PATH
+            try:
+                # Copy so the cached parse is not modified in place
+                zone_config = dict(_load_json_cached(zone_config_path))
+            except FileNotFoundError:
+                zone_config = {}
+            changed = False
+            for key in ('zone_coordinates', 'parking_line_points'):
+                if key in settings_dict:
+                    if _as_points(settings_dict[key]) != _as_points(zone_config.get(key)):
+                        changed = True
+                    zone_config[key] = settings_dict[key]
+            if not changed:
+                # Same points as on disk - skip the write and reload
+                return
+            _write_file_atomic(zone_config_path, _json_dumps(zone_config))
+            _json_file_cache.pop(zone_config_path, None)
             # Reload zone config
             load_zone_config()
         except Exception as e:
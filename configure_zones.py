@@ -4,11 +4,10 @@ Interactive tool to configure dock zone and parking line coordinates
 """
 import cv2
 import json
-import os
 import numpy as np
 import config
 
-CONFIG_FILE = config.ZONE_CONFIG_FILE
+CONFIG_FILE = config.ZONE_CONFIG_PATH
 VIDEO_SOURCE = config.VIDEO_SOURCE
 
 
@@ -31,6 +30,11 @@ class ZoneConfigurator:
         self.scale_y = 1.0
         self.x_offset = 0
         self.y_offset = 0
+        self._crop_shape = None  # Frame (height, width) the cached crop slice was computed for
+        self._crop_slice = None
+        self._layout_key = None  # (frame h, frame w, window w, window h) of the cached layout
+        self._layout = None
+        self._canvas = None  # Window-sized display canvas
     
     def _crop_frame(self, frame):
         """
@@ -43,36 +47,44 @@ class ZoneConfigurator:
         if frame is None:
             return frame
         
+        # Bounds only depend on the frame size, so clamp once per video resolution
+        shape = frame.shape[:2]
+        if shape != self._crop_shape:
+            self._crop_slice = self._compute_crop_slice(*shape)
+            self._crop_shape = shape
+        
+        # Crop the frame (reduce frame size by keeping only the specified region)
+        return frame[self._crop_slice]
+    
+    @staticmethod
+    def _compute_crop_slice(frame_height, frame_width):
+        """Clamp the crop rectangle to the frame bounds and return it as (rows, cols) slices"""
         # Crop coordinates: x1=659, y1=0, x2=1987, y2=1626
         # Area to keep: rectangle defined by (1987,0), (659,0), (659,1626), (1987,1626)
         x1, y1 = 659, 0
         x2, y2 = 1987, 1626
         
-        # Get frame dimensions
-        frame_height, frame_width = frame.shape[:2]
-        
         # Ensure crop coordinates are within frame bounds
         x1 = max(0, min(x1, frame_width))
         y1 = max(0, min(y1, frame_height))
         x2 = max(x1, min(x2, frame_width))
         y2 = max(y1, min(y2, frame_height))
-        
-        # Crop the frame (reduce frame size by keeping only the specified region)
-        cropped_frame = frame[y1:y2, x1:x2]
-        return cropped_frame
+        return (slice(y1, y2), slice(x1, x2))
         
     def load_config(self):
         """Load existing configuration from JSON"""
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    self.config = json.load(f)
-                    self.zone_points = self.config.get('zone_coordinates', [])
-                    self.parking_line_points = self.config.get('parking_line_points', [])
-                    print(f"Loaded existing configuration from {CONFIG_FILE}")
-                    return True
-            except Exception as e:
-                print(f"Error loading config: {e}")
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                self.config = json.load(f)
+                # Points are kept as tuples so OpenCV drawing calls can use them directly
+                self.zone_points = list(map(tuple, self.config.get('zone_coordinates', [])))
+                self.parking_line_points = list(map(tuple, self.config.get('parking_line_points', [])))
+                print(f"Loaded existing configuration from {CONFIG_FILE}")
+                return True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading config: {e}")
         return False
     
     def save_config(self):
@@ -83,7 +95,7 @@ class ZoneConfigurator:
         }
         try:
             with open(CONFIG_FILE, 'w') as f:
-                json.dump(self.config, f, indent=4)
+                json.dump(self.config, f, indent=2)
             print(f"\nConfiguration saved to {CONFIG_FILE}")
             print(f"Zone points: {len(self.zone_points)} points")
             print(f"Parking line points: {len(self.parking_line_points)} points")
@@ -103,29 +115,38 @@ class ZoneConfigurator:
                 orig_y = int((y - self.y_offset) / self.scale_y)
                 
                 if self.mode == "zone":
-                    self.zone_points.append([orig_x, orig_y])
+                    self.zone_points.append((orig_x, orig_y))
                     print(f"Zone point {len(self.zone_points)}: ({orig_x}, {orig_y})")
                 elif self.mode == "parking_line":
-                    self.parking_line_points.append([orig_x, orig_y])
+                    self.parking_line_points.append((orig_x, orig_y))
                     print(f"Parking line point {len(self.parking_line_points)}: ({orig_x}, {orig_y})")
                 self.draw_frame()
     
     def draw_frame(self):
         """Draw current frame with zones and lines"""
-        frame = self.current_frame.copy()
+        # Only copy the frame when something is drawn on it (resize below makes its own copy)
+        if self.zone_points or self.parking_line_points:
+            frame = self.current_frame.copy()
+        else:
+            frame = self.current_frame
         
         # Draw zone polygon
         if len(self.zone_points) >= 3:
             pts = np.array(self.zone_points, np.int32)
-            pts = pts.reshape((-1, 1, 2))
-            cv2.polylines(frame, [pts], True, (0, 255, 0), 2)
-            overlay = frame.copy()
-            cv2.fillPoly(overlay, [pts], (0, 255, 0))
-            cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
+            cv2.polylines(frame, [pts.reshape((-1, 1, 2))], True, (0, 255, 0), 2)
+            # Blend the fill only inside the polygon's bounding box - outside it the blend is a no-op
+            x, y, w, h = cv2.boundingRect(pts)
+            x1, y1 = max(x, 0), max(y, 0)
+            x2, y2 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+            if x2 > x1 and y2 > y1:
+                roi = frame[y1:y2, x1:x2]
+                overlay = roi.copy()
+                cv2.fillPoly(overlay, [pts - (x1, y1)], (0, 255, 0))
+                cv2.addWeighted(overlay, 0.2, roi, 0.8, 0, roi)
         
         # Draw zone points
         for i, point in enumerate(self.zone_points):
-            cv2.circle(frame, tuple(point), 5, (0, 255, 0), -1)
+            cv2.circle(frame, point, 5, (0, 255, 0), -1)
             cv2.putText(frame, f"Z{i+1}", (point[0]+10, point[1]), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
         
@@ -136,29 +157,26 @@ class ZoneConfigurator:
         
         # Draw parking line points
         for i, point in enumerate(self.parking_line_points):
-            cv2.circle(frame, tuple(point), 5, (0, 255, 255), -1)
+            cv2.circle(frame, point, 5, (0, 255, 255), -1)
             cv2.putText(frame, f"P{i+1}", (point[0]+10, point[1]), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
         
         # Resize frame to fit window size while maintaining aspect ratio
         original_height, original_width = frame.shape[:2]
-        scale = min(self.window_width / original_width, self.window_height / original_height)
-        new_width = int(original_width * scale)
-        new_height = int(original_height * scale)
-        
-        # Store scale factors for coordinate conversion
-        self.scale_x = new_width / original_width
-        self.scale_y = new_height / original_height
+        new_width, new_height = self._get_layout(original_height, original_width)
         
         # Resize frame
         frame_resized = cv2.resize(frame, (new_width, new_height))
         
-        # Create a black canvas of window size
-        display_frame = np.zeros((self.window_height, self.window_width, 3), dtype=np.uint8)
+        # Reuse the window-sized canvas; only the black margins need clearing,
+        # the frame area is overwritten below
+        display_frame = self._canvas
+        display_frame[:self.y_offset] = 0
+        display_frame[self.y_offset+new_height:] = 0
+        display_frame[:, :self.x_offset] = 0
+        display_frame[:, self.x_offset+new_width:] = 0
         
         # Center the resized frame on the canvas
-        self.y_offset = (self.window_height - new_height) // 2
-        self.x_offset = (self.window_width - new_width) // 2
         display_frame[self.y_offset:self.y_offset+new_height, self.x_offset:self.x_offset+new_width] = frame_resized
         
         # Draw instructions on display frame
@@ -170,6 +188,35 @@ class ZoneConfigurator:
         
         cv2.imshow(self.window_name, display_frame)
     
+    def _get_layout(self, original_height, original_width):
+        """
+        Compute the letterbox layout for a frame size (cached until the frame or window size changes)
+        Updates scale factors and offsets used for coordinate conversion
+        Returns:
+            tuple: (new_width, new_height) of the resized frame
+        """
+        key = (original_height, original_width, self.window_width, self.window_height)
+        if key != self._layout_key:
+            scale = min(self.window_width / original_width, self.window_height / original_height)
+            new_width = int(original_width * scale)
+            new_height = int(original_height * scale)
+            
+            # Store scale factors for coordinate conversion
+            self.scale_x = new_width / original_width
+            self.scale_y = new_height / original_height
+            
+            # Center offsets of the resized frame on the canvas
+            self.y_offset = (self.window_height - new_height) // 2
+            self.x_offset = (self.window_width - new_width) // 2
+            
+            # Black canvas of window size, reused across redraws
+            if self._canvas is None or self._canvas.shape[:2] != (self.window_height, self.window_width):
+                self._canvas = np.zeros((self.window_height, self.window_width, 3), dtype=np.uint8)
+            
+            self._layout = (new_width, new_height)
+            self._layout_key = key
+        return self._layout
+    
     def clear_current(self):
         """Clear current mode's points"""
         if self.mode == "zone":
@@ -180,13 +227,34 @@ class ZoneConfigurator:
             print("Parking line points cleared")
         self.draw_frame()
     
+    @staticmethod
+    def _open_capture(video_source):
+        """
+        Open video source, preferring FFMPEG with hardware-accelerated decoding for files/streams
+        Falls back to the default backend (e.g. camera indices, older OpenCV builds)
+        """
+        cap = None
+        if isinstance(video_source, str) and hasattr(cv2, 'VIDEO_ACCELERATION_ANY'):
+            cap = cv2.VideoCapture(video_source, cv2.CAP_FFMPEG,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+            if not cap.isOpened():
+                cap.release()
+                cap = None
+        if cap is None:
+            cap = cv2.VideoCapture(video_source)
+        if cap.isOpened():
+            # Keep at most one queued frame so a live stream shows the latest frame, not a stale one
+            # (backends without a settable buffer ignore this)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+    
     def run(self):
         """Run the configuration tool"""
         # Load existing config if available
         self.load_config()
         
         # Open video
-        self.cap = cv2.VideoCapture(self.video_source)
+        self.cap = self._open_capture(self.video_source)
         if not self.cap.isOpened():
             print(f"Error: Could not open video source: {self.video_source}")
             return
@@ -259,6 +327,9 @@ class ZoneConfigurator:
                     print("End of video")
             elif key == ord('b'):
                 # Previous frame (reset to beginning)
+                if self.cap.get(cv2.CAP_PROP_POS_FRAMES) <= 1:
+                    # Already showing the first frame
+                    continue
                 self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                 ret, frame = self.cap.read()
                 if ret:
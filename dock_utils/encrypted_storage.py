@@ -6,7 +6,32 @@ Uses AES encryption with a bundled key
 import os
 import sys
 import json
+import base64
+import functools
+import hashlib
+import traceback
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# orjson is optional - faster JSON for the payload and old plain JSON files
+# Both helpers work on bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps  # Compact output by default
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# msgpack is optional and only read: files saved as msgpack by earlier versions still load when it
+# is installed, but payloads are always written as JSON so every runtime can read them
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
 
 # Encryption key bundled in exe (Fernet format - base64-urlsafe-encoded 32-byte key)
@@ -15,8 +40,24 @@ from cryptography.fernet import Fernet
 # Fernet keys are 32 bytes, base64-urlsafe-encoded (44 characters)
 # This key is generated once and bundled - same key used for all encryption/decryption
 _ENCRYPTION_KEY = b'VGecwETdB5rFz1wtVzNBjzHIewOz2RpNDbP8-kETB3c='
-# Cache for Fernet instance
+# Cache for Fernet instance (only used to read files written by older versions)
 _FERNET_INSTANCE = None
+# Cache for AES-GCM instance
+_AESGCM_INSTANCE = None
+
+# Resolved once - neither changes while the process runs
+_FROZEN = getattr(sys, 'frozen', False)
+_EXE_DIR = os.path.dirname(sys.executable) if _FROZEN else None
+# Print full tracebacks on save errors in development, or in the exe when DOCKMGT_DEBUG is set
+_DEBUG = not _FROZEN or bool(os.getenv('DOCKMGT_DEBUG'))
+
+# Files written with AES-GCM start with this header, followed by the nonce and ciphertext
+# (older files are Fernet tokens, which always start with 'gAAAAA')
+_FILE_MAGIC = b'DMSE1'
+_NONCE_SIZE = 12
+
+# Digest of the last payload written per file, so saving unchanged data skips encryption and disk I/O
+_LAST_HASHES = {}
 
 
 def _get_encryption_key():
@@ -39,19 +80,61 @@ def _get_fernet():
     return _FERNET_INSTANCE
 
 
+def _get_aesgcm():
+    """Get AES-256-GCM cipher instance for encryption/decryption (cached)"""
+    global _AESGCM_INSTANCE
+    if _AESGCM_INSTANCE is None:
+        # Same bundled key, decoded to its raw 32 bytes
+        _AESGCM_INSTANCE = AESGCM(base64.urlsafe_b64decode(_get_encryption_key()))
+    return _AESGCM_INSTANCE
+
+
+def _encrypt(payload):
+    """Encrypt bytes as header + nonce + AES-GCM ciphertext (tag included)"""
+    nonce = os.urandom(_NONCE_SIZE)
+    return _FILE_MAGIC + nonce + _get_aesgcm().encrypt(nonce, payload, _FILE_MAGIC)
+
+
+def _decrypt(blob):
+    """Decrypt bytes written by _encrypt, or a Fernet token from older versions"""
+    if blob.startswith(_FILE_MAGIC):
+        # Slice through a memoryview so the ciphertext is not copied before decryption
+        view = memoryview(blob)
+        start = len(_FILE_MAGIC)
+        nonce = view[start:start + _NONCE_SIZE]
+        return _get_aesgcm().decrypt(nonce, view[start + _NONCE_SIZE:], _FILE_MAGIC)
+    # Fernet file - rewritten as AES-GCM on next save
+    return _get_fernet().decrypt(blob)
+
+
+@functools.lru_cache(maxsize=None)
 def _get_encrypted_file_path(filename):
-    """Get path for encrypted file (in exe directory when frozen)"""
-    if getattr(sys, 'frozen', False):
+    """Get path for encrypted file (in exe directory when frozen, cached per filename)"""
+    if _FROZEN:
         # Running as exe - store in exe directory with .encrypted extension
-        exe_dir = os.path.dirname(sys.executable)
         # Change extension to .encrypted to make it non-readable as JSON
         base_name = os.path.splitext(filename)[0]
-        return os.path.join(exe_dir, f"{base_name}.encrypted")
+        return os.path.join(_EXE_DIR, f"{base_name}.encrypted")
     else:
         # Development mode - use original filename
         return filename
 
 
+def _serialize(data_dict):
+    """Serialize dict to compact JSON bytes"""
+    return _json_dumps(data_dict)
+
+
+def _deserialize(payload):
+    """Deserialize bytes written by _serialize (or msgpack written by older versions)"""
+    # A JSON object always starts with '{'; a msgpack map never does
+    if payload[:1] == b'{':
+        return _json_loads(payload)
+    if not MSGPACK_AVAILABLE:
+        raise ImportError("msgpack is required to read this file")
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
 def save_encrypted_data(data_dict, filename):
     """
     Save data dictionary in encrypted format using AES encryption
@@ -62,28 +145,37 @@ def save_encrypted_data(data_dict, filename):
         bool: True if successful
     """
     try:
-        # Convert dict to JSON string
-        json_str = json.dumps(data_dict, indent=None)  # No indent to reduce size
-        json_bytes = json_str.encode('utf-8')
+        # Serialize dict to bytes (compact JSON)
+        payload = _serialize(data_dict)
         
-        # Encrypt using Fernet (AES-128 in CBC mode with HMAC)
-        fernet = _get_fernet()
-        encrypted_bytes = fernet.encrypt(json_bytes)
-        
-        # Save to file (already base64 encoded by Fernet)
+        # Nothing to do if the file already holds exactly this payload
         file_path = _get_encrypted_file_path(filename)
-        with open(file_path, 'wb') as f:
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        if _LAST_HASHES.get(file_path) == digest and os.path.exists(file_path):
+            return True
+        
+        # Encrypt using AES-256-GCM (authenticated, no base64/HMAC layer)
+        encrypted_bytes = _encrypt(payload)
+        
+        # Write to a temp file and swap it in so a crash never leaves a partial file
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
             f.write(encrypted_bytes)
+            # Make sure the data is on disk before the rename makes it visible
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        _LAST_HASHES[file_path] = digest
         
-        if getattr(sys, 'frozen', False):
+        if _FROZEN:
             print(f"Settings saved to encrypted file: {os.path.basename(file_path)}")
         else:
             print(f"Settings saved to {file_path}")
         return True
     except Exception as e:
         print(f"Error saving encrypted data: {e}")
-        import traceback
-        traceback.print_exc()
+        if _DEBUG:
+            traceback.print_exc()
         return False
 
 
@@ -99,10 +191,9 @@ def load_encrypted_data(filename):
     
     if not os.path.exists(file_path):
         # Try original filename as fallback (for development or migration)
-        if getattr(sys, 'frozen', False):
+        if _FROZEN:
             # In exe mode, also try checking exe directory with original name
-            exe_dir = os.path.dirname(sys.executable)
-            fallback_path = os.path.join(exe_dir, filename)
+            fallback_path = os.path.join(_EXE_DIR, filename)
             if os.path.exists(fallback_path):
                 file_path = fallback_path
             else:
@@ -111,27 +202,23 @@ def load_encrypted_data(filename):
             return None
     
     try:
-        # Read encrypted data
-        with open(file_path, 'rb') as f:
+        # Read encrypted data (one read sized from fstat - files are small, so no mmap)
+        with open(file_path, 'rb', buffering=0) as f:
             encrypted_bytes = f.read()
         
-        # Decrypt using Fernet
-        fernet = _get_fernet()
-        json_bytes = fernet.decrypt(encrypted_bytes)
+        # Decrypt (AES-GCM, or Fernet for files from older versions)
+        payload = _decrypt(encrypted_bytes)
         
-        # Parse JSON
-        json_str = json_bytes.decode('utf-8')
-        data_dict = json.loads(json_str)
-        
-        return data_dict
+        # Parse payload (msgpack files from older versions are rewritten as JSON on next save)
+        return _deserialize(payload)
     except Exception as e:
         # If decryption fails, try reading as plain JSON (for migration from old format)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'rb') as f:
                 # Try to read as JSON (might be old format)
                 content = f.read()
                 try:
-                    return json.loads(content)
+                    return _json_loads(content)
                 except:
                     # Not valid JSON, decryption failed
                     print(f"Warning: Could not decrypt data from {file_path}: {e}")
@@ -139,4 +226,3 @@ def load_encrypted_data(filename):
         except Exception as e2:
             print(f"Warning: Could not load encrypted data from {file_path}: {e}, {e2}")
             return None
-
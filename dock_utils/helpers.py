@@ -3,6 +3,8 @@ Helper utility functions
 """
 import cv2
 import numpy as np
+from config import HUMAN_ZONE_CHECK_POINT_ORDER as CHECK_POINT_ORDER, get_check_point_indices
+from dock_utils.helpers_numba import NUMBA_AVAILABLE, pnpoly_batch, segments_intersect, boxes_line_clip, as_polygon_array
 
 
 def is_point_in_zone(point, zone_coordinates):
@@ -36,6 +38,115 @@ def is_point_in_zone(point, zone_coordinates):
     return inside
 
 
+def prepare_zone(zone_coordinates):
+    """
+    Precompute polygon edge arrays used by the vectorized zone checks
+    Build once per zone and rebuild whenever the zone changes
+    Args:
+        zone_coordinates: List of (x, y) tuples defining polygon vertices
+            (an already prepared zone is returned unchanged)
+    Returns:
+        dict: Polygon and per-edge arrays, or None if fewer than 3 points
+    """
+    if zone_coordinates is None or isinstance(zone_coordinates, dict):
+        return zone_coordinates
+    if len(zone_coordinates) < 3:
+        return None
+    
+    poly = as_polygon_array(zone_coordinates)
+    # Edge i runs from the previous vertex (p1) to vertex i (p2), as in is_point_in_zone
+    p2x = poly[:, 0].copy()
+    p2y = poly[:, 1].copy()
+    p1x = np.roll(p2x, 1)
+    p1y = np.roll(p2y, 1)
+    return {
+        'poly': poly,
+        # Axis-aligned bounding box (xmin, ymin, xmax, ymax) for a quick reject
+        'bounds': (float(p2x.min()), float(p2y.min()), float(p2x.max()), float(p2y.max())),
+        'p1x': p1x,
+        'p1y': p1y,
+        'p2y': p2y,
+        'dx': p2x - p1x,
+        'dy': p2y - p1y,
+        'dy_sign': np.sign(p2y - p1y),  # Horizontal edges (0) never cross - masked by the span test
+        # OpenCV contour layout for cv2.pointPolygonTest
+        'contour': poly.astype(np.float32).reshape(-1, 1, 2),
+    }
+
+
+# Mask values written by zone_mask
+MASK_OUTSIDE, MASK_INSIDE, MASK_EDGE = 0, 1, 2
+
+
+def zone_mask(zone, shape):
+    """
+    Rasterize a prepared zone for one frame size (built once, cached on the zone)
+    Pixels within 2 px of an edge are marked MASK_EDGE - points there still get the exact
+    test, so a mask lookup never disagrees with points_in_zone
+    Args:
+        zone: Zone prepared by prepare_zone
+        shape: (height, width) of the frames the points come from
+    Returns:
+        np.ndarray: (height, width) uint8 array of MASK_OUTSIDE / MASK_INSIDE / MASK_EDGE
+    """
+    masks = zone.setdefault('masks', {})
+    mask = masks.get(shape)
+    if mask is None:
+        mask = np.zeros(shape, dtype=np.uint8)
+        pts = np.round(zone['poly']).astype(np.int32)
+        cv2.fillPoly(mask, [pts], MASK_INSIDE)
+        # A point is at most sqrt(2) px from the pixel it is looked up in, so a
+        # 5 px wide band keeps every ambiguous lookup off the filled area
+        cv2.polylines(mask, [pts], True, MASK_EDGE, thickness=5)
+        masks[shape] = mask
+    return mask
+
+
+def points_in_zone(points, zone, mask=None):
+    """
+    Vectorized version of is_point_in_zone for many points at once (same edge rules)
+    Args:
+        points: (N, 2) array-like of (x, y) points
+        zone: Zone prepared by prepare_zone (or raw polygon vertices, M >= 3)
+        mask: Optional zone_mask for the frame the points come from; points are then a
+            single lookup each, and only points near an edge or off the frame run the polygon test
+    Returns:
+        np.ndarray: (N,) bool array, True where the point is inside the zone
+    """
+    zone = prepare_zone(zone)
+    pts = as_polygon_array(points).reshape(-1, 2)
+    if mask is not None:
+        h, w = mask.shape
+        xi = np.floor(pts[:, 0]).astype(np.intp)
+        yi = np.floor(pts[:, 1]).astype(np.intp)
+        on_frame = (xi >= 0) & (xi < w) & (yi >= 0) & (yi < h)
+        values = np.full(len(pts), MASK_EDGE, dtype=np.uint8)
+        values[on_frame] = mask[yi[on_frame], xi[on_frame]]
+        inside = values == MASK_INSIDE
+        exact = values == MASK_EDGE
+        if exact.any():
+            inside[exact] = points_in_zone(pts[exact], zone)
+        return inside
+    if NUMBA_AVAILABLE:
+        # Compiled loop - no temporary (N, M) arrays
+        return pnpoly_batch(zone['poly'], pts)
+    
+    px = pts[:, 0:1]
+    py = pts[:, 1:2]
+    p1y = zone['p1y']
+    
+    # Edge spans the point's y (min < y <= max) and the point is left of the crossing:
+    # px <= p1x + (py - p1y) * dx / dy, multiplied through by dy so no division is needed
+    # (exact for pixel coordinates; the comparison flips for edges with dy < 0)
+    crosses = (p1y >= py) != (zone['p2y'] >= py)
+    lhs = (px - zone['p1x']) * zone['dy']
+    rhs = (py - p1y) * zone['dx']
+    hits = crosses & ((lhs - rhs) * zone['dy_sign'] <= 0)
+    
+    # Odd number of crossings = inside
+    return (np.count_nonzero(hits, axis=1) & 1).astype(bool)
+
+
 def check_line_inside_box(box, line_points):
     """
     Check if parking line is inside or intersects with the truck's bounding box
@@ -47,40 +158,46 @@ def check_line_inside_box(box, line_points):
     """
     if len(line_points) < 2:
         return False
+    return bool(boxes_touching_line([box], line_points)[0])
+
+
+def boxes_touching_line(boxes, line_points):
+    """
+    Batch version of check_line_inside_box for many boxes at once
+    Args:
+        boxes: (T, 4) array-like of (x1, y1, x2, y2) bounding boxes
+        line_points: (P, 2) array-like of points defining the line
+    Returns:
+        np.ndarray: (T,) bool array, True where the line is inside or intersects the box
+    """
+    b = as_polygon_array(boxes).reshape(-1, 4)
+    pts = as_polygon_array(line_points).reshape(-1, 2)
+    if len(pts) < 2:
+        return np.zeros(len(b), dtype=bool)
+    if NUMBA_AVAILABLE:
+        # Compiled loop - stops at the first segment that touches each box
+        return boxes_line_clip(b, pts)
+    
+    lo = np.minimum(b[:, :2], b[:, 2:])[:, None, :]  # (box_left, box_top), shape (T, 1, 2)
+    hi = np.maximum(b[:, :2], b[:, 2:])[:, None, :]  # (box_right, box_bottom)
+    
+    # Liang-Barsky clip of every line segment against every box at once
+    # (a segment with an end point inside the box always clips to a non-empty part)
+    start = pts[:-1]
+    delta = pts[1:] - start
+    p = np.concatenate((-delta, delta), axis=1)  # Left, top, right, bottom boundaries, shape (S, 4)
+    q = np.concatenate((start - lo, hi - start), axis=2)  # Shape (T, S, 4)
+    
+    parallel = p == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = q / np.where(parallel, 1.0, p)
     
-    x1, y1, x2, y2 = box
-    box_left = min(x1, x2)
-    box_right = max(x1, x2)
-    box_top = min(y1, y2)
-    box_bottom = max(y1, y2)
-    
-    # Check if any point of the line is inside the box
-    for point in line_points:
-        px, py = point
-        if box_left <= px <= box_right and box_top <= py <= box_bottom:
-            return True
-    
-    # Check if line segment intersects with box edges
-    # Check each line segment
-    for i in range(len(line_points) - 1):
-        p1 = line_points[i]
-        p2 = line_points[i + 1]
-        
-        # Check if line segment intersects any edge of the box
-        # Top edge
-        if line_segment_intersects((box_left, box_top), (box_right, box_top), p1, p2):
-            return True
-        # Bottom edge
-        if line_segment_intersects((box_left, box_bottom), (box_right, box_bottom), p1, p2):
-            return True
-        # Left edge
-        if line_segment_intersects((box_left, box_top), (box_left, box_bottom), p1, p2):
-            return True
-        # Right edge
-        if line_segment_intersects((box_right, box_top), (box_right, box_bottom), p1, p2):
-            return True
-    
-    return False
+    # Parallel to a boundary and outside it - no intersection
+    outside = (parallel & (q < 0)).any(axis=2)
+    # Latest entering and earliest leaving parameter along each segment (clamped to [0, 1])
+    t_enter = np.where(p < 0, r, 0.0).max(axis=2)
+    t_leave = np.where(p > 0, r, 1.0).min(axis=2)
+    return (~outside & (t_enter <= t_leave)).any(axis=1)
 
 
 def line_segment_intersects(line1_start, line1_end, line2_start, line2_end):
@@ -88,15 +205,13 @@ def line_segment_intersects(line1_start, line1_end, line2_start, line2_end):
     Check if two line segments intersect
     Uses the cross product method
     """
-    def ccw(A, B, C):
-        """Check if three points are in counter-clockwise order"""
-        return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
-    
-    A, B = line1_start, line1_end
-    C, D = line2_start, line2_end
-    
-    # Check if line segments AB and CD intersect
-    return ccw(A, C, D) != ccw(B, C, D) and ccw(A, B, C) != ccw(A, B, D)
+    # Unpack once; segments_intersect and its module-level ccw take plain scalars
+    # (compiled with Numba when available, plain Python otherwise)
+    ax, ay = line1_start
+    bx, by = line1_end
+    cx, cy = line2_start
+    dx, dy = line2_end
+    return segments_intersect(ax, ay, bx, by, cx, cy, dx, dy)
 
 
 def is_bbox_in_zone(bbox, zone_coordinates):
@@ -104,15 +219,21 @@ def is_bbox_in_zone(bbox, zone_coordinates):
     Check if a bounding box is inside or intersects with the zone
     Args:
         bbox: [x1, y1, x2, y2] bounding box coordinates
-        zone_coordinates: List of (x, y) tuples defining polygon vertices
+        zone_coordinates: List of (x, y) tuples defining polygon vertices, or a zone from prepare_zone
     Returns:
         bool: True if bbox is at least partially inside zone
     """
-    if zone_coordinates is None or len(zone_coordinates) < 3:
+    zone = prepare_zone(zone_coordinates)
+    if zone is None:
         return True  # If no zone configured, allow all detections
     
     x1, y1, x2, y2 = bbox
     
+    # A box entirely outside the zone's bounding box cannot have a point inside the zone
+    zone_xmin, zone_ymin, zone_xmax, zone_ymax = zone['bounds']
+    if x2 < zone_xmin or x1 > zone_xmax or y2 < zone_ymin or y1 > zone_ymax:
+        return False
+    
     # Check if any corner of the bounding box is inside the zone
     corners = [
         (x1, y1),  # Top-left
@@ -126,11 +247,46 @@ def is_bbox_in_zone(bbox, zone_coordinates):
     corners.append(center)
     
     # If any corner or center is inside the zone, consider it inside
-    for point in corners:
-        if is_point_in_zone(point, zone_coordinates):
-            return True
+    return bool(points_in_zone(corners, zone).any())
+
+
+# Bbox check points are ordered as config.HUMAN_ZONE_CHECK_POINT_ORDER (imported as CHECK_POINT_ORDER)
+ALL_CHECK_POINTS = tuple(range(len(CHECK_POINT_ORDER)))
+# Row m is the bool mask over CHECK_POINT_ORDER for bitmask m (bit i = CHECK_POINT_ORDER[i])
+_CHECK_POINT_MASK_ROWS = (np.arange(1 << len(CHECK_POINT_ORDER))[:, None] >> np.arange(len(CHECK_POINT_ORDER))) & 1 == 1
+_CHECK_POINT_MASK_ROWS.setflags(write=False)
+
+
+def _check_point_indices(check_points_config):
+    """Normalize a check point config (index tuple, bitmask, dict or None) to a tuple of enabled indices"""
+    if isinstance(check_points_config, tuple):
+        indices = check_points_config
+    elif isinstance(check_points_config, int):
+        indices = tuple(i for i in ALL_CHECK_POINTS if check_points_config >> i & 1)
+    elif check_points_config is None:
+        # Default: if no config provided, use all points (backward compatibility)
+        indices = ALL_CHECK_POINTS
+    else:
+        return get_check_point_indices(check_points_config)  # Dict: same rule as the config
     
-    return False
+    # If no points are enabled, default to checking all (safety fallback)
+    return indices or ALL_CHECK_POINTS
+
+
+def check_point_mask(check_points_config):
+    """
+    Convert a check point config to a boolean mask over CHECK_POINT_ORDER
+    Args:
+        check_points_config: Bitmask (e.g. config.HUMAN_ZONE_CHECK_MASK), tuple of enabled
+            point indices, dictionary, or None (all points)
+    Returns:
+        np.ndarray: (5,) bool array for bboxes_in_zone (read-only for bitmasks)
+    """
+    if isinstance(check_points_config, int) and 0 < check_points_config < len(_CHECK_POINT_MASK_ROWS):
+        return _CHECK_POINT_MASK_ROWS[check_points_config]
+    mask = np.zeros(len(CHECK_POINT_ORDER), dtype=bool)
+    mask[list(_check_point_indices(check_points_config))] = True
+    return mask
 
 
 def is_human_bbox_in_zone(bbox, zone_coordinates, check_points_config):
@@ -138,8 +294,9 @@ def is_human_bbox_in_zone(bbox, zone_coordinates, check_points_config):
     Check if a human bounding box is inside the zone based on configurable check points
     Args:
         bbox: [x1, y1, x2, y2] bounding box coordinates
-        zone_coordinates: List of (x, y) tuples defining polygon vertices
-        check_points_config: Dictionary with keys:
+        zone_coordinates: List of (x, y) tuples defining polygon vertices, or a zone from prepare_zone
+        check_points_config: Bitmask or tuple of enabled point indices into CHECK_POINT_ORDER
+            (precomputed, e.g. config.HUMAN_ZONE_CHECK_MASK), or a dictionary with keys:
             - 'top_left': bool - Check top-left corner (x1, y1)
             - 'top_right': bool - Check top-right corner (x2, y1)
             - 'bottom_right': bool - Check bottom-right corner (x2, y2)
@@ -148,52 +305,78 @@ def is_human_bbox_in_zone(bbox, zone_coordinates, check_points_config):
     Returns:
         bool: True if any enabled check point is inside the zone
     """
-    if zone_coordinates is None or len(zone_coordinates) < 3:
+    zone = prepare_zone(zone_coordinates)
+    if zone is None:
         return True  # If no zone configured, allow all detections
     
-    # Default: if no config provided, use all points (backward compatibility)
-    if check_points_config is None:
-        check_points_config = {
-            'top_left': True,
-            'top_right': True,
-            'bottom_right': True,
-            'bottom_left': True,
-            'center': True
-        }
+    indices = _check_point_indices(check_points_config)
     
     x1, y1, x2, y2 = bbox
     
-    # Build list of points to check based on configuration
-    points_to_check = []
-    
-    if check_points_config.get('top_left', False):
-        points_to_check.append((x1, y1))  # Top-left corner
-    
-    if check_points_config.get('top_right', False):
-        points_to_check.append((x2, y1))  # Top-right corner
+    # A box entirely outside the zone's bounding box cannot have a point inside the zone
+    zone_xmin, zone_ymin, zone_xmax, zone_ymax = zone['bounds']
+    if x2 < zone_xmin or x1 > zone_xmax or y2 < zone_ymin or y1 > zone_ymax:
+        return False
     
-    if check_points_config.get('bottom_right', False):
-        points_to_check.append((x2, y2))  # Bottom-right corner
+    points = (
+        (x1, y1),  # Top-left
+        (x2, y1),  # Top-right
+        (x2, y2),  # Bottom-right
+        (x1, y2),  # Bottom-left
+        ((x1 + x2) / 2, (y1 + y2) / 2)  # Center
+    )
     
-    if check_points_config.get('bottom_left', False):
-        points_to_check.append((x1, y2))  # Bottom-left corner
+    # Check if any enabled point is inside the zone
+    return bool(points_in_zone([points[i] for i in indices], zone).any())
+
+
+def bboxes_in_zone(bboxes, zone_coordinates, point_mask=None, frame_shape=None):
+    """
+    Check many bounding boxes against the zone in one vectorized pass
+    (batch version of is_bbox_in_zone / is_human_bbox_in_zone)
+    Args:
+        bboxes: (N, 4) array-like of [x1, y1, x2, y2] bounding boxes
+        zone_coordinates: List of (x, y) tuples defining polygon vertices, or a zone from prepare_zone
+        point_mask: Bool mask over CHECK_POINT_ORDER, shape (5,) for all boxes or (N, 5) per box
+            (see check_point_mask); None checks all five points
+        frame_shape: (height, width) of the frame the boxes come from; enables the
+            rasterized zone lookup when Numba is not installed (see zone_mask)
+    Returns:
+        np.ndarray: (N,) bool array, True where any enabled check point is inside the zone
+    """
+    boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    zone = prepare_zone(zone_coordinates)
+    if zone is None:
+        return np.ones(len(boxes), dtype=bool)  # If no zone configured, allow all detections
     
-    if check_points_config.get('center', False):
-        points_to_check.append(((x1 + x2) / 2, (y1 + y2) / 2))  # Center point
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    result = np.zeros(len(boxes), dtype=bool)
     
-    # If no points are enabled, default to checking all (safety fallback)
-    if len(points_to_check) == 0:
-        points_to_check = [
-            (x1, y1),  # Top-left
-            (x2, y1),  # Top-right
-            (x2, y2),  # Bottom-right
-            (x1, y2),  # Bottom-left
-            ((x1 + x2) / 2, (y1 + y2) / 2)  # Center
-        ]
+    # Only boxes overlapping the zone's bounding box need the polygon test
+    zone_xmin, zone_ymin, zone_xmax, zone_ymax = zone['bounds']
+    near = ~((x2 < zone_xmin) | (x1 > zone_xmax) | (y2 < zone_ymin) | (y1 > zone_ymax))
+    if not near.any():
+        return result
+    x1, y1, x2, y2 = x1[near], y1[near], x2[near], y2[near]
     
-    # Check if any enabled point is inside the zone
-    for point in points_to_check:
-        if is_point_in_zone(point, zone_coordinates):
-            return True
+    # (N, 5, 2) check points in CHECK_POINT_ORDER
+    points = np.stack((
+        np.stack((x1, y1), axis=1),  # Top-left
+        np.stack((x2, y1), axis=1),  # Top-right
+        np.stack((x2, y2), axis=1),  # Bottom-right
+        np.stack((x1, y2), axis=1),  # Bottom-left
+        np.stack(((x1 + x2) / 2, (y1 + y2) / 2), axis=1),  # Center
+    ), axis=1)
+    # The compiled pnpoly loop beats the lookup; without Numba the mask is faster
+    mask = None
+    if frame_shape is not None and not NUMBA_AVAILABLE:
+        mask = zone_mask(zone, tuple(frame_shape[:2]))
+    inside = points_in_zone(points.reshape(-1, 2), zone, mask).reshape(-1, len(CHECK_POINT_ORDER))
     
-    return False
\ No newline at end of file
+    if point_mask is not None:
+        point_mask = np.asarray(point_mask, dtype=bool)
+        if point_mask.ndim == 2:
+            point_mask = point_mask[near]
+        inside &= point_mask
+    result[near] = inside.any(axis=1)
+    return result
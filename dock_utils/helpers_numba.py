@@ -0,0 +1,147 @@
+"""
+Compiled geometry kernels
+Uses Numba when it is installed; otherwise the same kernels run as plain Python
+"""
+import sys
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Numba's on-disk cache needs the source file, which is not available in the exe
+_CACHE = not getattr(sys, 'frozen', False)
+
+
+def _jit(func):
+    """Compile with Numba if available, otherwise return the Python function"""
+    if NUMBA_AVAILABLE:
+        return njit(cache=_CACHE)(func)
+    return func
+
+
+@_jit
+def pnpoly(poly, px, py):
+    """
+    Ray-casting point-in-polygon test (same edge rules as helpers.is_point_in_zone)
+    The crossing test is cross-multiplied instead of divided, so it is exact for pixel coordinates
+    Args:
+        poly: (N, 2) float64 C-contiguous array of polygon vertices
+        px, py: Point coordinates
+    Returns:
+        bool: True if point is inside polygon
+    """
+    n = poly.shape[0]
+    inside = False
+    p1x = poly[n - 1, 0]
+    p1y = poly[n - 1, 1]
+    for i in range(n):
+        p2x = poly[i, 0]
+        p2y = poly[i, 1]
+        if (p1y >= py) != (p2y >= py):
+            # px <= x of the edge at py, multiplied through by dy (flips when dy < 0)
+            dy = p2y - p1y
+            lhs = (px - p1x) * dy
+            rhs = (py - p1y) * (p2x - p1x)
+            if (lhs <= rhs) if dy > 0 else (lhs >= rhs):
+                inside = not inside
+        p1x = p2x
+        p1y = p2y
+    return inside
+
+
+@_jit
+def pnpoly_batch(poly, points):
+    """
+    pnpoly over many points
+    Args:
+        poly: (N, 2) float64 C-contiguous array of polygon vertices
+        points: (K, 2) float64 C-contiguous array of points
+    Returns:
+        np.ndarray: (K,) bool array, True where the point is inside polygon
+    """
+    n = points.shape[0]
+    out = np.empty(n, dtype=np.bool_)
+    for i in range(n):
+        out[i] = pnpoly(poly, points[i, 0], points[i, 1])
+    return out
+
+
+@_jit
+def _ccw(ax, ay, bx, by, cx, cy):
+    """Check if three points are in counter-clockwise order"""
+    return (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+
+
+@_jit
+def segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+    """Check if segments AB and CD intersect (same rule as helpers.line_segment_intersects)"""
+    return (_ccw(ax, ay, cx, cy, dx, dy) != _ccw(bx, by, cx, cy, dx, dy) and
+            _ccw(ax, ay, bx, by, cx, cy) != _ccw(ax, ay, bx, by, dx, dy))
+
+
+@_jit
+def boxes_line_clip(boxes, pts):
+    """
+    Liang-Barsky clip of every line segment against every box (same rule as helpers.boxes_touching_line)
+    Args:
+        boxes: (T, 4) float64 C-contiguous array of [x1, y1, x2, y2] boxes
+        pts: (P, 2) float64 C-contiguous array of line points, P >= 2
+    Returns:
+        np.ndarray: (T,) bool array, True where the line is inside or intersects the box
+    """
+    n = boxes.shape[0]
+    out = np.zeros(n, dtype=np.bool_)
+    for b in range(n):
+        lox = min(boxes[b, 0], boxes[b, 2])
+        hix = max(boxes[b, 0], boxes[b, 2])
+        loy = min(boxes[b, 1], boxes[b, 3])
+        hiy = max(boxes[b, 1], boxes[b, 3])
+        for s in range(pts.shape[0] - 1):
+            sx = pts[s, 0]
+            sy = pts[s, 1]
+            dx = pts[s + 1, 0] - sx
+            dy = pts[s + 1, 1] - sy
+            t_enter = 0.0
+            t_leave = 1.0
+            outside = False
+            # Left, top, right, bottom boundaries
+            for k in range(4):
+                if k == 0:
+                    p, q = -dx, sx - lox
+                elif k == 1:
+                    p, q = -dy, sy - loy
+                elif k == 2:
+                    p, q = dx, hix - sx
+                else:
+                    p, q = dy, hiy - sy
+                if p == 0:
+                    if q < 0:
+                        outside = True  # Parallel to the boundary and outside it
+                        break
+                elif p < 0:
+                    t_enter = max(t_enter, q / p)
+                else:
+                    t_leave = min(t_leave, q / p)
+            if not outside and t_enter <= t_leave:
+                out[b] = True
+                break
+    return out
+
+
+def as_polygon_array(zone_coordinates):
+    """Convert zone coordinates to the array layout expected by the kernels"""
+    return np.ascontiguousarray(zone_coordinates, dtype=np.float64)
+
+
+def warmup():
+    """Trigger JIT compilation up front so the first frame is not delayed"""
+    poly = as_polygon_array([(0, 0), (1, 0), (0, 1)])
+    pnpoly(poly, 0.0, 0.0)
+    pnpoly_batch(poly, poly)
+    boxes_line_clip(as_polygon_array([(0, 0, 1, 1)]), poly)
+    # Pixel coordinates arrive as ints (bbox corners) and floats (centers)
+    segments_intersect(0, 0, 1, 1, 0, 1, 1, 0)
+    segments_intersect(0.0, 0.0, 1.0, 1.0, 0.0, 1.0, 1.0, 0.0)
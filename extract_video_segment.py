@@ -5,6 +5,57 @@ Extracts a portion of video from start_time to end_time
 import cv2
 import sys
 import os
+import shutil
+import subprocess
+
+
+def _extract_with_ffmpeg(input_video, output_video, start_seconds, end_seconds):
+    """
+    Cut the segment with ffmpeg stream copy (no decode/re-encode, lossless)
+    The cut starts at the nearest keyframe at or before start_seconds
+    Returns:
+        bool: True if ffmpeg succeeded, False if ffmpeg is not installed or failed
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        return False
+    
+    cmd = [ffmpeg, '-y', '-loglevel', 'error',
+           '-ss', str(start_seconds), '-to', str(end_seconds), '-i', input_video,
+           '-c', 'copy', '-avoid_negative_ts', 'make_zero', output_video]
+    print(f"\nCopying segment with ffmpeg (no re-encode)...")
+    result = subprocess.run(cmd)
+    if result.returncode != 0:
+        print(f"Warning: ffmpeg stream copy failed (exit code {result.returncode}), falling back to OpenCV")
+        return False
+    return True
+
+
+def _open_writer(output_video, fps, width, height):
+    """
+    Open the fastest available video writer for the re-encode fallback
+    Tries the NVIDIA hardware encoder (cv2.cudacodec), then H.264 ('avc1'),
+    then the original MPEG-4 Part 2 ('mp4v') software encoder
+    Returns:
+        tuple: (writer, on_gpu) - writer is None if no encoder could be opened
+    """
+    cudacodec = getattr(cv2, 'cudacodec', None)
+    if cudacodec is not None:
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                writer = cudacodec.createVideoWriter(output_video, (width, height),
+                                                     codec=cudacodec.H264, fps=fps)
+                print("Encoding with NVIDIA hardware encoder (H.264)")
+                return writer, True
+        except cv2.error as e:
+            print(f"Warning: GPU video encoder unavailable ({e}), using CPU encoder")
+    
+    for codec in ('avc1', 'mp4v'):
+        writer = cv2.VideoWriter(output_video, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+        if writer.isOpened():
+            return writer, False
+        writer.release()
+    return None, False
 
 
 def extract_video_segment(input_video, output_video, start_minutes, end_minutes):
@@ -67,14 +118,19 @@ def extract_video_segment(input_video, output_video, start_minutes, end_minutes)
     print(f"  End: {end_minutes} minutes ({end_seconds} seconds, frame {end_frame})")
     print(f"  Duration: {end_minutes - start_minutes} minutes")
     
+    # Fast path: copy the compressed packets when ffmpeg is installed
+    if _extract_with_ffmpeg(input_video, output_video, start_seconds, end_seconds):
+        cap.release()
+        print(f"\n✓ Output saved to: {output_video}")
+        return True
+    
     # Set starting position
     cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
     
-    # Define codec and create VideoWriter
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_video, fourcc, fps, (width, height))
+    # Create VideoWriter (GPU H.264 if available, otherwise CPU)
+    out, on_gpu = _open_writer(output_video, fps, width, height)
     
-    if not out.isOpened():
+    if out is None:
         print(f"Error: Could not create output video file '{output_video}'")
         cap.release()
         return False
@@ -82,15 +138,22 @@ def extract_video_segment(input_video, output_video, start_minutes, end_minutes)
     # Extract frames
     current_frame = start_frame
     frame_count = 0
+    # Frame buffers are allocated on the first read and reused for every frame after
+    frame = None
+    gpu_frame = cv2.cuda_GpuMat() if on_gpu else None
     
     print(f"\nProcessing frames...")
     while current_frame < end_frame:
-        ret, frame = cap.read()
+        ret, frame = cap.read(frame)
         if not ret:
             print(f"Warning: Could not read frame {current_frame}")
             break
         
-        out.write(frame)
+        if on_gpu:
+            gpu_frame.upload(frame)
+            out.write(gpu_frame)
+        else:
+            out.write(frame)
         current_frame += 1
         frame_count += 1
         
@@ -11,41 +11,44 @@ if not getattr(sys, 'frozen', False):
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'dock_utils'))
 # In frozen mode, config.py is bundled and will be imported normally
 
-# Import all required libraries at build time for PyInstaller to detect them
-# This ensures all dependencies are included in the executable
-try:
-    import torch
-    import torchvision
-    import cv2
-    import numpy as np
-    from PIL import Image, ImageTk
-    import pandas as pd
-    import requests
-    try:
-        from pyModbusTCP.client import ModbusClient  # Actual package name
-    except ImportError:
-        pass
-    import tkinter as tk
-    from tkinter import ttk, messagebox
-    # Try to import yolov5 - this ensures PyInstaller includes it
-    try:
-        import yolov5
-        import logging.config  # Ensure logging.config is available for yolov5
-    except ImportError:
-        pass  # Will use torch.hub instead
-    # Import ultralytics/yolov5 via torch.hub dependencies
+
+def _bundle_imports():
+    """
+    Import all required libraries at build time for PyInstaller to detect them
+    Never called at runtime - torch alone takes seconds to import, so the heavy
+    modules are only loaded in main() after the license check
+    """
     try:
-        # This ensures torch.hub dependencies are available
-        import ultralytics
-    except ImportError:
-        pass
-except ImportError as e:
-    print(f"Warning: Some optional imports failed: {e}")
-    # Continue anyway - may be optional dependencies
+        import torch
+        import torchvision
+        import cv2
+        import numpy as np
+        from PIL import Image, ImageTk
+        import pandas as pd
+        import requests
+        try:
+            from pyModbusTCP.client import ModbusClient  # Actual package name
+        except ImportError:
+            pass
+        import tkinter as tk
+        from tkinter import ttk, messagebox
+        # Try to import yolov5 - this ensures PyInstaller includes it
+        try:
+            import yolov5
+            import logging.config  # Ensure logging.config is available for yolov5
+        except ImportError:
+            pass  # Will use torch.hub instead
+        # Import ultralytics/yolov5 via torch.hub dependencies
+        try:
+            # This ensures torch.hub dependencies are available
+            import ultralytics
+        except ImportError:
+            pass
+    except ImportError as e:
+        print(f"Warning: Some optional imports failed: {e}")
+        # Continue anyway - may be optional dependencies
+
 
-from src.detector import YOLODetector
-from src.dock_manager import DockManager
-from src.ui import DockManagementUI
 from src.license_manager import LicenseManager
 
 # Import config (bundled in exe, or from project root in development)
@@ -78,6 +81,11 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     
+    # Heavy modules (torch, YOLO, tkinter UI) are only loaded once the license is valid
+    from src.detector import YOLODetector
+    from src.dock_manager import DockManager
+    from src.ui import DockManagementUI
+    
     # Check if model exists (resolve path if relative)
     model_path = config.MODEL_PATH
     if model_path and not os.path.isabs(model_path):
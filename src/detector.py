@@ -8,11 +8,54 @@ import numpy as np
 import torch
 import warnings
 import config
-from dock_utils.helpers import is_bbox_in_zone, is_human_bbox_in_zone
+from dock_utils.helpers import prepare_zone, bboxes_in_zone, check_point_mask
+
+# Check point mask for trucks and other objects (all five points)
+ALL_POINTS_MASK = check_point_mask(None)
 
 # Suppress YOLOv5 deprecation warnings
 warnings.filterwarnings('ignore', category=FutureWarning, message='.*torch.cuda.amp.autocast.*')
 
+# Input shapes are fixed per camera, so let cuDNN pick the fastest convolution algorithms once
+torch.backends.cudnn.benchmark = True
+
+
+def _yolov5_ops():
+    """Get NMS / box scaling from whichever YOLOv5 copy loaded the model"""
+    try:
+        from yolov5.utils.general import make_divisible, non_max_suppression, scale_boxes
+    except ImportError:
+        # torch.hub checkout (its directory is on sys.path once the model is loaded)
+        from utils.general import make_divisible, non_max_suppression, scale_boxes
+    return make_divisible, non_max_suppression, scale_boxes
+
+
+def _letterbox_into(frame, out):
+    """
+    Letterbox a frame into a preallocated (H, W, 3) uint8 buffer in one pass
+    Same result as YOLOv5's letterbox(frame, (H, W), auto=False), but the resize writes straight
+    into the buffer and only the padding strips are filled, instead of resize + pad + copy
+    """
+    h1, w1 = out.shape[:2]
+    h, w = frame.shape[:2]
+    r = min(h1 / h, w1 / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    top, left = int(round((h1 - nh) / 2 - 0.1)), int(round((w1 - nw) / 2 - 0.1))
+    
+    roi = out[top:top + nh, left:left + nw]
+    if (h, w) == (nh, nw):
+        roi[:] = frame
+    else:
+        resized = cv2.resize(frame, (nw, nh), dst=roi, interpolation=cv2.INTER_LINEAR)
+        if resized.ctypes.data != roi.ctypes.data:
+            roi[:] = resized  # OpenCV allocated a new array instead of using the view
+    
+    # Gray padding (114), as in YOLOv5
+    out[:top] = 114
+    out[top + nh:] = 114
+    out[top:top + nh, :left] = 114
+    out[top:top + nh, left + nw:] = 114
+
 
 class YOLODetector:
     """YOLOv5-based object detector"""
@@ -21,7 +64,7 @@ class YOLODetector:
         """
         Initialize YOLOv5 detector
         Args:
-            model_path: Path to YOLOv5 model file (.pt)
+            model_path: Path to YOLOv5 model file (.pt, or a TensorRT .engine)
             zone_coordinates: Zone coordinates to filter detections (optional)
         """
         # Resolve model path relative to executable directory if relative
@@ -31,20 +74,35 @@ class YOLODetector:
         else:
             self.model_path = raw_path
         self.model = None
+        self._names = None  # Class ID to name mapping from the model
+        self._infer = None  # Inference path picked in load_model (_infer_pinned or _infer_autoshape)
+        # Pinned-memory batch path buffers (CUDA only)
+        self._pinned_batch = None  # Page-locked host staging buffer (B, H, W, 3) uint8
+        self._gpu_batch = None  # Same-shaped buffer on the GPU
+        self._copy_stream = None  # CUDA stream for the host-to-device copies
+        # CUDA graph replay of the network forward (PyTorch weights on CUDA, set up in load_model)
+        self._use_cuda_graphs = False
+        self._graphs = {}  # Input shape -> (graph, static input, static output)
         self.zone_coordinates = zone_coordinates or config.ZONE_COORDINATES
+        self._zone = prepare_zone(self.zone_coordinates)  # Edge arrays for the zone filter
         self.load_model()
     
     def update_zone(self, zone_coordinates):
         """Update zone coordinates for filtering"""
+        if zone_coordinates is not self.zone_coordinates:
+            # Only rebuild the edge arrays when the zone actually changes (called every batch)
+            self._zone = prepare_zone(zone_coordinates)
         self.zone_coordinates = zone_coordinates
     
-    def load_model(self):
-        """Load YOLOv5 model using torch.hub with GPU support"""
-        # Determine device (GPU or CPU)
+    def _select_device(self):
+        """
+        Pick the inference device from the config
+        Returns:
+            str: Device string ('cuda', 'cpu' or config.DEVICE)
+        """
         if config.USE_GPU and torch.cuda.is_available():
             device = 'cuda'
-            device_name = torch.cuda.get_device_name(0)
-            print(f"GPU detected: {device_name}")
+            print(f"GPU detected: {torch.cuda.get_device_name(0)}")
         else:
             device = 'cpu'
             if config.USE_GPU:
@@ -56,45 +114,69 @@ class YOLODetector:
         if config.DEVICE:
             device = config.DEVICE
             print(f"Using explicit device: {device}")
+        return device
+    
+    def load_model(self):
+        """Load YOLOv5 model (yolov5 package, falling back to torch.hub) and pick the inference path once"""
+        device = self._select_device()
+        
+        # Use (or build) a TensorRT engine / OpenVINO model when enabled - loaded the same way as a .pt file
+        if config.USE_TENSORRT and device.startswith('cuda'):
+            self.model_path = self._get_engine_path(self.model_path)
+        elif config.USE_OPENVINO and device == 'cpu':
+            self.model_path = self._get_openvino_path(self.model_path)
+            if not self.model_path.endswith('.pt'):
+                # OpenVINO runs its own thread pool; keep torch (pre/post-processing) from competing with it
+                torch.set_num_threads(1)
         
         try:
             # Try loading with yolov5 package first (works better in frozen executables)
             try:
                 import yolov5
                 self.model = yolov5.load(self.model_path, device=device)
-                self.model.conf = config.CONFIDENCE_THRESHOLD
-                print(f"YOLOv5 model loaded successfully using yolov5 package from {self.model_path} on {device.upper()}")
-            except (ImportError, Exception) as yolov5_error:
+                loader = 'yolov5 package'
+            except Exception as yolov5_error:
                 # Fallback to torch.hub method (may fail in frozen executables due to cache issues)
                 print(f"yolov5 package load failed, trying torch.hub: {yolov5_error}")
                 try:
                     # Load YOLOv5 model using torch.hub
                     # This loads the custom model from local path
                     self.model = torch.hub.load('ultralytics/yolov5', 'custom', path=self.model_path, trust_repo=True)
-                    self.model.conf = config.CONFIDENCE_THRESHOLD  # Set confidence threshold
-                    
-                    # YOLOv5 models from torch.hub automatically use GPU if available
-                    # But we can explicitly set device for batch processing
-                    if hasattr(self.model, 'device'):
-                        # Some YOLOv5 versions support explicit device setting
-                        try:
-                            if device == 'cuda' and torch.cuda.is_available():
-                                # Ensure model is on GPU
-                                if next(self.model.model.parameters()).device.type != 'cuda':
-                                    self.model.model = self.model.model.cuda()
-                                print(f"Model on GPU: {device_name}")
-                            else:
-                                if next(self.model.model.parameters()).device.type == 'cuda':
-                                    self.model.model = self.model.model.cpu()
-                                print(f"Model on CPU")
-                        except:
-                            # If device setting fails, model will use default (usually auto-detects GPU)
-                            pass
-                    
-                    print(f"YOLOv5 model loaded successfully from {self.model_path}")
+                    # torch.hub puts the model on the GPU whenever one is available
+                    self.model.to(device)
+                    loader = 'torch.hub'
                 except Exception as hub_error:
                     print(f"torch.hub load also failed: {hub_error}")
                     raise
+            print(f"YOLOv5 model loaded successfully using {loader} from {self.model_path} on {device.upper()}")
+            
+            self.model.conf = config.CONFIDENCE_THRESHOLD  # Set confidence threshold
+            # NMS settings: only trucks and people survive NMS, capped to a realistic count
+            self.model.iou = config.NMS_IOU_THRESHOLD
+            self.model.max_det = config.MAX_DETECTIONS
+            self.model.classes = [config.TRUCK_CLASS_ID, config.PERSON_CLASS_ID]
+            self.model.agnostic = False
+            self.model.multi_label = False
+            self._names = getattr(self.model, 'names', None)
+            
+            on_cuda = device.startswith('cuda') and torch.cuda.is_available()
+            if on_cuda and getattr(self.model, 'pt', False):
+                # PyTorch weights: channels_last layout (and FP16, if MODEL_PRECISION opts in) suit the GPU's tensor cores
+                self.model.to(memory_format=torch.channels_last)
+                if config.MODEL_PRECISION == 'fp16':
+                    self.model.half()
+                print(f"Model running in {config.MODEL_PRECISION.upper()} with channels_last layout")
+            
+            # Pick the inference path once: batches are staged through pinned memory when the model
+            # runs on CUDA behind AutoShape; everything else goes through AutoShape itself
+            self._graphs = {}
+            if on_cuda and hasattr(self.model, 'dmb'):
+                self._infer = self._infer_pinned
+                # Graph capture needs the PyTorch module (exported backends run their own runtime)
+                self._use_cuda_graphs = config.USE_CUDA_GRAPHS and self.model.pt
+            else:
+                self._infer = self._infer_autoshape
+                self._use_cuda_graphs = False
         except Exception as e:
             print(f"\nAll YOLOv5 loading methods failed.")
             print(f"Error: {e}")
@@ -104,6 +186,79 @@ class YOLODetector:
             print("  3. Or ultralytics package is available for torch.hub")
             raise
     
+    def _get_engine_path(self, model_path):
+        """
+        Get the TensorRT engine for a .pt model, exporting it on first use
+        Args:
+            model_path: Path to the YOLOv5 model file
+        Returns:
+            str: Path to the .engine file, or model_path unchanged if the export is not possible
+        """
+        if not model_path.endswith('.pt'):
+            return model_path  # Already an engine (or another format the loaders handle)
+        
+        # Dynamic batch axis so detect_batch can run up to BATCH_SIZE frames
+        # (YOLOv5's exporter cannot combine a dynamic axis with FP16)
+        dynamic = config.ENABLE_BATCH_PROCESSING and config.BATCH_SIZE > 1
+        half = config.TENSORRT_PRECISION == 'fp16' and not dynamic
+        if config.TENSORRT_PRECISION == 'fp16' and dynamic:
+            print("Note: FP16 TensorRT engines need a fixed batch size - exporting FP32 for batch processing")
+        return self._get_exported_model(model_path, os.path.splitext(model_path)[0] + '.engine',
+                                        f"TensorRT {'FP16' if half else 'FP32'}",
+                                        include=('engine',), half=half, device=0, dynamic=dynamic,
+                                        batch_size=config.BATCH_SIZE if dynamic else 1)
+    
+    def _get_openvino_path(self, model_path):
+        """
+        Get the OpenVINO model for a .pt model, exporting it on first use
+        An INT8 model quantized offline (e.g. with NNCF) in <model>_int8_openvino_model is used first
+        Args:
+            model_path: Path to the YOLOv5 model file
+        Returns:
+            str: Path to the OpenVINO model directory, or model_path unchanged if the export is not possible
+        """
+        if not model_path.endswith('.pt'):
+            return model_path  # Already exported (or another format the loaders handle)
+        
+        base_path = os.path.splitext(model_path)[0]
+        int8_path = base_path + '_int8_openvino_model'
+        if os.path.isdir(int8_path):
+            print(f"Using OpenVINO INT8 model {int8_path}")
+            return int8_path
+        # Dynamic batch axis so the same model serves detect and detect_batch
+        return self._get_exported_model(model_path, base_path + '_openvino_model', "OpenVINO",
+                                        include=('openvino',), device='cpu', dynamic=True)
+    
+    def _get_exported_model(self, model_path, export_path, label, **export_args):
+        """
+        Export a .pt model with YOLOv5's exporter, once
+        The export is written next to the .pt file and redone when the .pt is newer
+        Args:
+            model_path: Path to the YOLOv5 .pt model file
+            export_path: File or directory the exporter writes
+            label: Format name for messages
+            export_args: Arguments for yolov5.export.run
+        Returns:
+            str: export_path, or model_path unchanged if the export is not possible
+        """
+        if os.path.exists(export_path) and os.path.getmtime(export_path) >= os.path.getmtime(model_path):
+            print(f"Using {label} model {export_path}")
+            return export_path
+        
+        print(f"Exporting {label} model - this can take several minutes on first run...")
+        try:
+            from yolov5 import export
+            export.run(weights=model_path, **export_args)
+        except Exception as e:
+            print(f"Warning: {label} export failed, using PyTorch model: {e}")
+            return model_path
+        
+        if not os.path.exists(export_path):
+            print(f"Warning: {label} export produced no model, using PyTorch model")
+            return model_path
+        print(f"{label} model saved to {export_path}")
+        return export_path
+    
     def detect(self, frame):
         """
         Perform detection on a frame
@@ -115,102 +270,13 @@ class YOLODetector:
         if self.model is None:
             return {}
         
-        # YOLOv5 inference
-        results = self.model(frame)
-        
-        detections = {
-            'trucks': [],
-            'humans': []
-        }
-        
-        # YOLOv5 returns results in pandas DataFrame format
-        # Access detections via results.pandas().xyxy[0]
+        # Read the raw [x1, y1, x2, y2, conf, cls] tensor instead of building a pandas DataFrame
+        frame_results = self._infer([frame])[0]
         try:
-            detections_df = results.pandas().xyxy[0]  # Get detections as DataFrame
-            
-            for idx, row in detections_df.iterrows():
-                # Get class ID and confidence
-                cls_id = int(row['class'])
-                conf = float(row['confidence'])
-                
-                # Ignore forklifts (class 1)
-                if cls_id == config.CLASS_IDS['forklift']:
-                    continue
-                
-                # Get bounding box coordinates
-                x1, y1, x2, y2 = int(row['xmin']), int(row['ymin']), int(row['xmax']), int(row['ymax'])
-                
-                # Get class name
-                class_name = row['name']
-                
-                bbox = {
-                    'bbox': [x1, y1, x2, y2],
-                    'confidence': conf,
-                    'class_id': cls_id,
-                    'class_name': class_name
-                }
-                
-                # Filter: Only include detections inside the zone
-                if self.zone_coordinates and len(self.zone_coordinates) >= 3:
-                    # For humans, use configurable check points; for others, use standard method
-                    if cls_id == config.CLASS_IDS['person']:
-                        # Use human-specific zone checking with configurable points
-                        human_check_config = getattr(config, 'HUMAN_ZONE_CHECK_POINTS', None)
-                        if not is_human_bbox_in_zone([x1, y1, x2, y2], self.zone_coordinates, human_check_config):
-                            continue  # Skip detections outside the zone
-                    else:
-                        # For trucks and other objects, use standard method
-                        if not is_bbox_in_zone([x1, y1, x2, y2], self.zone_coordinates):
-                            continue  # Skip detections outside the zone
-                
-                # Categorize detections by class ID
-                if cls_id == config.CLASS_IDS['truck']:  # Class 2 is truck
-                    detections['trucks'].append(bbox)
-                elif cls_id == config.CLASS_IDS['person']:  # Class 0 is person
-                    detections['humans'].append(bbox)
-                # Forklifts (class 1) are ignored - already skipped above
+            return self._parse_detections(frame_results, self._names, frame.shape)
         except Exception as e:
-            # Fallback: try accessing results directly if pandas format not available
-            print(f"Warning: Could not parse results as DataFrame: {e}")
-            # Try alternative format
-            if hasattr(results, 'xyxy') and len(results.xyxy) > 0:
-                # Results in tensor format
-                for detection in results.xyxy[0]:
-                    if len(detection) >= 6:  # [x1, y1, x2, y2, conf, cls]
-                        x1, y1, x2, y2, conf, cls_id = detection[:6]
-                        cls_id = int(cls_id)
-                        conf = float(conf)
-                        
-                        # Ignore forklifts (class 1)
-                        if cls_id == config.CLASS_IDS['forklift']:
-                            continue
-                        
-                        bbox = {
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'confidence': conf,
-                            'class_id': cls_id,
-                            'class_name': f'class_{cls_id}'
-                        }
-                        
-                        # Filter: Only include detections inside the zone
-                        if self.zone_coordinates and len(self.zone_coordinates) >= 3:
-                            # For humans, use configurable check points; for others, use standard method
-                            if cls_id == config.CLASS_IDS['person']:
-                                # Use human-specific zone checking with configurable points
-                                human_check_config = getattr(config, 'HUMAN_ZONE_CHECK_POINTS', None)
-                                if not is_human_bbox_in_zone([int(x1), int(y1), int(x2), int(y2)], self.zone_coordinates, human_check_config):
-                                    continue  # Skip detections outside the zone
-                            else:
-                                # For trucks and other objects, use standard method
-                                if not is_bbox_in_zone([int(x1), int(y1), int(x2), int(y2)], self.zone_coordinates):
-                                    continue  # Skip detections outside the zone
-                        
-                        if cls_id == config.CLASS_IDS['truck']:
-                            detections['trucks'].append(bbox)
-                        elif cls_id == config.CLASS_IDS['person']:
-                            detections['humans'].append(bbox)
-        
-        return detections
+            print(f"Warning: Could not parse detection results: {e}")
+            return {'trucks': [], 'humans': []}
     
     def detect_batch(self, frames):
         """
@@ -223,116 +289,15 @@ class YOLODetector:
         if self.model is None or len(frames) == 0:
             return [{'trucks': [], 'humans': []} for _ in frames]
         
-        # YOLOv5 batch inference - pass list of frames
-        results = self.model(frames)
-        
-        batch_detections = []
-        
-        # YOLOv5 returns results for each frame in the batch
-        # results.pandas().xyxy is a list where each element corresponds to a frame
+        # One [x1, y1, x2, y2, conf, cls] tensor per frame in the batch
+        predictions = self._infer(frames)
         try:
-            results_list = results.pandas().xyxy  # List of DataFrames, one per frame
-            
-            for frame_idx, detections_df in enumerate(results_list):
-                detections = {
-                    'trucks': [],
-                    'humans': []
-                }
-                
-                for idx, row in detections_df.iterrows():
-                    # Get class ID and confidence
-                    cls_id = int(row['class'])
-                    conf = float(row['confidence'])
-                    
-                    # Ignore forklifts (class 1)
-                    if cls_id == config.CLASS_IDS['forklift']:
-                        continue
-                    
-                    # Get bounding box coordinates
-                    x1, y1, x2, y2 = int(row['xmin']), int(row['ymin']), int(row['xmax']), int(row['ymax'])
-                    
-                    # Get class name
-                    class_name = row['name']
-                    
-                    bbox = {
-                        'bbox': [x1, y1, x2, y2],
-                        'confidence': conf,
-                        'class_id': cls_id,
-                        'class_name': class_name
-                    }
-                    
-                    # Filter: Only include detections inside the zone
-                    if self.zone_coordinates and len(self.zone_coordinates) >= 3:
-                        # For humans, use configurable check points; for others, use standard method
-                        if cls_id == config.CLASS_IDS['person']:
-                            # Use human-specific zone checking with configurable points
-                            human_check_config = getattr(config, 'HUMAN_ZONE_CHECK_POINTS', None)
-                            if not is_human_bbox_in_zone([x1, y1, x2, y2], self.zone_coordinates, human_check_config):
-                                continue  # Skip detections outside the zone
-                        else:
-                            # For trucks and other objects, use standard method
-                            if not is_bbox_in_zone([x1, y1, x2, y2], self.zone_coordinates):
-                                continue  # Skip detections outside the zone
-                    
-                    # Categorize detections by class ID
-                    if cls_id == config.CLASS_IDS['truck']:  # Class 2 is truck
-                        detections['trucks'].append(bbox)
-                    elif cls_id == config.CLASS_IDS['person']:  # Class 0 is person
-                        detections['humans'].append(bbox)
-                
-                batch_detections.append(detections)
-                
+            batch_detections = [self._parse_detections(frame_results, self._names, frame.shape)
+                                for frame_results, frame in zip(predictions, frames)]
         except Exception as e:
-            # Fallback: try accessing results directly if pandas format not available
-            print(f"Warning: Could not parse batch results as DataFrame: {e}")
-            # Try alternative format - process each frame result
-            if hasattr(results, 'xyxy') and len(results.xyxy) > 0:
-                for frame_idx, frame_results in enumerate(results.xyxy):
-                    detections = {
-                        'trucks': [],
-                        'humans': []
-                    }
-                    
-                    if len(frame_results) > 0:
-                        for detection in frame_results:
-                            if len(detection) >= 6:  # [x1, y1, x2, y2, conf, cls]
-                                x1, y1, x2, y2, conf, cls_id = detection[:6]
-                                cls_id = int(cls_id)
-                                conf = float(conf)
-                                
-                                # Ignore forklifts (class 1)
-                                if cls_id == config.CLASS_IDS['forklift']:
-                                    continue
-                                
-                                bbox = {
-                                    'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                                    'confidence': conf,
-                                    'class_id': cls_id,
-                                    'class_name': f'class_{cls_id}'
-                                }
-                                
-                                # Filter: Only include detections inside the zone
-                                if self.zone_coordinates and len(self.zone_coordinates) >= 3:
-                                    # For humans, use configurable check points; for others, use standard method
-                                    if cls_id == config.CLASS_IDS['person']:
-                                        # Use human-specific zone checking with configurable points
-                                        human_check_config = getattr(config, 'HUMAN_ZONE_CHECK_POINTS', None)
-                                        if not is_human_bbox_in_zone([int(x1), int(y1), int(x2), int(y2)], self.zone_coordinates, human_check_config):
-                                            continue  # Skip detections outside the zone
-                                    else:
-                                        # For trucks and other objects, use standard method
-                                        if not is_bbox_in_zone([int(x1), int(y1), int(x2), int(y2)], self.zone_coordinates):
-                                            continue  # Skip detections outside the zone
-                                
-                                if cls_id == config.CLASS_IDS['truck']:
-                                    detections['trucks'].append(bbox)
-                                elif cls_id == config.CLASS_IDS['person']:
-                                    detections['humans'].append(bbox)
-                    
-                    batch_detections.append(detections)
-            else:
-                # If we can't parse results, return empty detections for all frames
-                batch_detections = [{'trucks': [], 'humans': []} for _ in frames]
+            # If we can't parse results, return empty detections for all frames
+            print(f"Warning: Could not parse batch detection results: {e}")
+            batch_detections = []
         
         # Ensure we return the same number of results as input frames
         while len(batch_detections) < len(frames):
@@ -340,6 +305,175 @@ class YOLODetector:
         
         return batch_detections[:len(frames)]
     
+    def _infer_autoshape(self, frames):
+        """
+        Run frames through AutoShape (CPU, exported CPU backends, or the fallback path)
+        Args:
+            frames: List of input image frames (numpy arrays)
+        Returns:
+            list: (N, 6) tensor of [x1, y1, x2, y2, conf, cls] per frame, in frame pixels
+        """
+        return self.model(frames).xyxy
+    
+    def _infer_pinned(self, frames):
+        """
+        Run frames through the pinned-memory CUDA path, switching to AutoShape for good if it fails
+        Args:
+            frames: List of input image frames (numpy arrays)
+        Returns:
+            list: (N, 6) tensor of [x1, y1, x2, y2, conf, cls] per frame, in frame pixels
+        """
+        try:
+            return self._infer_batch_pinned(frames)
+        except Exception as e:
+            print(f"Warning: Pinned-memory inference failed, using standard path: {e}")
+            self._infer = self._infer_autoshape
+            self._use_cuda_graphs = False
+            self._graphs = {}
+            return self._infer_autoshape(frames)
+    
+    def _infer_batch_pinned(self, frames):
+        """
+        Batch inference on CUDA with AutoShape's pre/post-processing (letterbox, NMS, box scaling)
+        Each frame is letterboxed straight into a pinned staging buffer and copied to the GPU
+        on a side stream while the next frame is letterboxed (channel reorder and scaling run on the GPU)
+        Args:
+            frames: List of input image frames (numpy arrays)
+        Returns:
+            list: (N, 6) tensor of [x1, y1, x2, y2, conf, cls] per frame, in frame pixels
+        """
+        make_divisible, non_max_suppression, scale_boxes = _yolov5_ops()
+        autoshape = self.model
+        backend = autoshape.model  # DetectMultiBackend (or the bare PyTorch model)
+        p = next(backend.parameters()) if autoshape.pt else torch.empty(1, device=backend.device)
+        
+        # Inference shape: PyTorch models take every frame scaled to 640 on its long side, padded to a
+        # stride multiple; exported engines are built for a fixed 640x640 input
+        size = 640
+        shape0 = [frame.shape[:2] for frame in frames]
+        if autoshape.pt:
+            shape1 = [make_divisible(x, autoshape.stride)
+                      for x in np.array([[int(y * size / max(s)) for y in s] for s in shape0]).max(0)]
+        else:
+            shape1 = [size, size]
+        n = len(frames)
+        pinned, gpu = self._get_batch_buffers(n, shape1, p.device)
+        
+        with torch.inference_mode():
+            with torch.cuda.stream(self._copy_stream):
+                for i, frame in enumerate(frames):
+                    _letterbox_into(frame[..., :3], pinned[i].numpy())
+                    gpu[i].copy_(pinned[i], non_blocking=True)
+            torch.cuda.current_stream(p.device).wait_stream(self._copy_stream)
+            
+            # BHWC uint8 to BCHW fp16/32 - the permuted view is already channels_last, which PyTorch
+            # models use as-is; exported backends (TensorRT) need plain contiguous NCHW
+            x = gpu[:n].permute(0, 3, 1, 2)
+            x = x.contiguous(memory_format=torch.channels_last if autoshape.pt else torch.contiguous_format)
+            x = x.type_as(p) / 255
+            with torch.autocast('cuda', enabled=autoshape.amp):
+                y = self._forward_graph(backend, x) if self._use_cuda_graphs else backend(x)
+                y = non_max_suppression(y if autoshape.dmb else y[0],
+                                        autoshape.conf,
+                                        autoshape.iou,
+                                        autoshape.classes,
+                                        autoshape.agnostic,
+                                        autoshape.multi_label,
+                                        max_det=autoshape.max_det)
+            for i in range(n):
+                scale_boxes(shape1, y[i][:, :4], shape0[i])
+        return y
+    
+    def _forward_graph(self, backend, x):
+        """
+        Run the network forward by replaying a CUDA graph captured for this input shape
+        The first call per shape warms up on a side stream and captures the graph; later calls copy
+        the input into the graph's static buffer and replay it (NMS stays outside - its output size varies)
+        Args:
+            backend: DetectMultiBackend wrapping the PyTorch model
+            x: (N, 3, H, W) input tensor on the GPU
+        Returns:
+            torch.Tensor: Raw predictions, held in the graph's static output (overwritten by the next replay)
+        """
+        key = tuple(x.shape)
+        entry = self._graphs.get(key)
+        if entry is None:
+            static_x = x.clone()
+            # Warm-up passes build the Detect grids and pick the cuDNN algorithms before capture
+            stream = torch.cuda.Stream(device=x.device)
+            stream.wait_stream(torch.cuda.current_stream(x.device))
+            with torch.cuda.stream(stream):
+                for _ in range(3):
+                    backend(static_x)
+            torch.cuda.current_stream(x.device).wait_stream(stream)
+            
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                static_y = backend(static_x)
+            entry = self._graphs[key] = (graph, static_x, static_y)
+            print(f"Captured CUDA graph for input shape {key}")
+        else:
+            entry[1].copy_(x)
+        graph, _, static_y = entry
+        graph.replay()
+        return static_y
+    
+    def _get_batch_buffers(self, n, shape, device):
+        """Get the pinned host and GPU staging buffers, reallocated only when the batch outgrows them"""
+        h, w = shape
+        if (self._pinned_batch is None or self._pinned_batch.shape[0] < n
+                or tuple(self._pinned_batch.shape[1:3]) != (h, w)):
+            capacity = max(n, config.BATCH_SIZE)
+            self._pinned_batch = torch.empty((capacity, h, w, 3), dtype=torch.uint8, pin_memory=True)
+            self._gpu_batch = torch.empty((capacity, h, w, 3), dtype=torch.uint8, device=device)
+            if self._copy_stream is None:
+                self._copy_stream = torch.cuda.Stream(device=device)
+        return self._pinned_batch, self._gpu_batch
+    
+    def _parse_detections(self, frame_results, names=None, frame_shape=None):
+        """
+        Convert one frame's raw detections into zone-filtered trucks and humans
+        All boxes of the frame are filtered with NumPy masks and one vectorized zone check
+        Args:
+            frame_results: (N, 6) tensor or array of [x1, y1, x2, y2, conf, cls]
+            names: Class ID to name mapping from the model (optional)
+            frame_shape: Shape of the frame, for the rasterized zone lookup (optional)
+        Returns:
+            dict: Detection results with 'trucks' and 'humans' lists
+        """
+        if hasattr(frame_results, 'detach'):
+            frame_results = frame_results.detach().cpu().numpy()
+        arr = np.asarray(frame_results, dtype=np.float64).reshape(-1, 6)
+        cls = arr[:, 5].astype(np.int32)
+        
+        # Only trucks and people are reported (forklifts and other classes are ignored)
+        is_human = cls == config.PERSON_CLASS_ID
+        keep = is_human | (cls == config.TRUCK_CLASS_ID)
+        boxes = arr[:, :4].astype(np.int32)  # Truncated to pixels like int(x)
+        
+        # Filter: Only include detections inside the zone
+        # (self._zone is None when no zone with at least 3 points is configured)
+        if keep.any() and self._zone is not None:
+            # Humans use the configurable check points; trucks use all five
+            point_mask = np.where(is_human[:, None], check_point_mask(config.HUMAN_ZONE_CHECK_MASK), ALL_POINTS_MASK)
+            keep[keep] = bboxes_in_zone(boxes[keep], self._zone, point_mask[keep], frame_shape)
+        
+        detections = {
+            'trucks': [],
+            'humans': []
+        }
+        # Build the result dicts only for the detections that survived
+        for i in np.flatnonzero(keep):
+            cls_id = int(cls[i])
+            detections['humans' if is_human[i] else 'trucks'].append({
+                'bbox': boxes[i].tolist(),
+                'confidence': float(arr[i, 4]),
+                'class_id': cls_id,
+                'class_name': names[cls_id] if names is not None else f'class_{cls_id}'
+            })
+        
+        return detections
+    
     def get_detection_summary(self, detections):
         """
         Get summary of detections
@@ -2,13 +2,17 @@
 Dock Management Logic Module
 Implements the business rules for dock state determination
 """
-from dock_utils.helpers import is_point_in_zone
+from dock_utils.helpers import prepare_zone, points_in_zone, boxes_touching_line
+from dock_utils.helpers_numba import NUMBA_AVAILABLE, pnpoly, warmup
 import config
+import numpy as np
 import time
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import urllib.request
 import urllib.error
-import json
+import requests
 
 
 class DockManager:
@@ -26,12 +30,24 @@ class DockManager:
         self.parking_line_points = parking_line_points or config.PARKING_LINE_POINTS
         self.current_state = "UNKNOWN"
         self.previous_state = "UNKNOWN"  # Track previous state to detect changes
-        self.state_history = []
-        self.parking_line_touch_start_time = None  # Timestamp when truck first touched parking line
+        self.state_history = deque(maxlen=1024)  # Bounded: the oldest entries drop off on a long-running dock
+        self.parking_line_touch_start_time = None  # time.monotonic() when truck first touched parking line
         self.wait_time_seconds = config.PARKING_LINE_WAIT_TIME
         self.not_touching_count = 0  # Count consecutive frames where truck is not touching (for grace period)
         self.grace_period_frames = config.PARKING_LINE_GRACE_PERIOD  # Number of consecutive "not touching" detections before resetting timer
         self.last_detection_summary = None  # Store last detection summary for API notes
+        self._last_frame_geom = (False, False)  # (truck_in_zone, truck_touching_line) from determine_state, for API notes
+        self._zone = None  # Zone edge arrays, rebuilt when the zone changes
+        self._rebuild_zone_cache()
+        warmup()  # Compile the point-in-zone kernel now instead of on the first frame
+        # Persistent workers for the (blocking) API requests, instead of a new thread per call
+        self._api_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dock-api')
+        # Dock status POSTs: coalesced over a short window and sent over one keep-alive connection
+        self._http = requests.Session()
+        self._pending_status = None  # Latest payload not yet picked up by a flush
+        self._status_timer = None  # threading.Timer that runs the next flush (off the API workers)
+        self._status_lock = threading.Lock()  # Guards _pending_status and _status_timer
+        self._send_lock = threading.Lock()  # One POST at a time, so statuses arrive in order
         
         # Initialize PLC manager if enabled
         if config.ENABLE_PLC:
@@ -46,6 +62,11 @@ class DockManager:
     def update_zone(self, zone_coordinates):
         """Update zone coordinates"""
         self.zone_coordinates = zone_coordinates
+        self._rebuild_zone_cache()
+    
+    def _rebuild_zone_cache(self):
+        """Precompute zone edge arrays once so per-frame checks skip list handling"""
+        self._zone = prepare_zone(self.zone_coordinates)
     
     def update_parking_line(self, parking_line_points):
         """Update parking line points"""
@@ -59,15 +80,60 @@ class DockManager:
         Returns:
             bool: True if truck is in zone
         """
-        if self.zone_coordinates is None:
+        if self._zone is None:
             return False
         
         # Check if truck center or bottom center is in zone
-        truck_center = ((truck_bbox[0] + truck_bbox[2]) / 2, (truck_bbox[1] + truck_bbox[3]) / 2)
-        truck_bottom = ((truck_bbox[0] + truck_bbox[2]) / 2, truck_bbox[3])
+        center_x = (truck_bbox[0] + truck_bbox[2]) / 2
+        center_y = (truck_bbox[1] + truck_bbox[3]) / 2
+        
+        # Both points share center_x and lie between center_y and y2, so one bounding-box
+        # comparison rules out trucks away from the zone before any polygon test
+        zone_xmin, zone_ymin, zone_xmax, zone_ymax = self._zone['bounds']
+        if not zone_xmin <= center_x <= zone_xmax or truck_bbox[3] < zone_ymin or center_y > zone_ymax:
+            return False
+        
+        if NUMBA_AVAILABLE:
+            poly = self._zone['poly']
+            return (pnpoly(poly, center_x, center_y) or 
+                    pnpoly(poly, center_x, float(truck_bbox[3])))
         
-        return (is_point_in_zone(truck_center, self.zone_coordinates) or 
-                is_point_in_zone(truck_bottom, self.zone_coordinates))
+        # Without Numba, the vectorized test (same edge rule as pnpoly, so the state does not
+        # depend on whether Numba is installed)
+        return bool(points_in_zone(((center_x, center_y), (center_x, truck_bbox[3])), self._zone).any())
+    
+    def trucks_in_zone(self, truck_bboxes):
+        """
+        Check many trucks against the dock zone at once (batch version of is_truck_in_zone)
+        Args:
+            truck_bboxes: (N, 4) array-like of [x1, y1, x2, y2] bounding boxes
+        Returns:
+            np.ndarray: (N,) bool array, True where the truck is in zone
+        """
+        boxes = np.asarray(truck_bboxes, dtype=np.float64).reshape(-1, 4)
+        result = np.zeros(len(boxes), dtype=bool)
+        if self._zone is None:
+            return result
+        
+        center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+        center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+        bottom_y = boxes[:, 3]
+        
+        # Bounding-box reject for all trucks in one pass; only the rest get the polygon test
+        zone_xmin, zone_ymin, zone_xmax, zone_ymax = self._zone['bounds']
+        near = np.flatnonzero((center_x >= zone_xmin) & (center_x <= zone_xmax) &
+                              (bottom_y >= zone_ymin) & (center_y <= zone_ymax))
+        if len(near) == 0:
+            return result
+        
+        # Center points, then bottom-center points, in one call (pnpoly_batch with Numba)
+        points = np.empty((2, len(near), 2))
+        points[:, :, 0] = center_x[near]
+        points[0, :, 1] = center_y[near]
+        points[1, :, 1] = bottom_y[near]
+        hits = points_in_zone(points.reshape(-1, 2), self._zone).reshape(2, -1)
+        result[near] = hits[0] | hits[1]
+        return result
     
     def is_truck_touching_parking_line(self, truck_bbox):
         """
@@ -102,7 +168,8 @@ class DockManager:
         truck_present = detection_summary['truck_present']
         human_present = detection_summary['human_present']
         trucks = detection_summary['trucks']
-        current_time = time.time()
+        # Monotonic clock: wall-clock adjustments (NTP, DST) cannot shorten or stretch the wait
+        current_time = time.monotonic()
         
         # Store detection info for API calls
         self.last_detection_summary = detection_summary
@@ -110,21 +177,24 @@ class DockManager:
         # Rule 1: No truck = GREEN
         if not truck_present:
             self.parking_line_touch_start_time = None  # Reset timer
+            self._last_frame_geom = (False, False)
             self.current_state = "GREEN"
             self._handle_state_change("GREEN")
             return self.current_state
         
-        # Check if any truck is in zone
-        truck_in_zone = False
+        # Check if any truck is in zone, and if any truck in the zone touches the parking line
+        if self._zone is None:
+            in_zone = []  # No zone configured - skip the per-truck checks
+        else:
+            boxes = np.array([truck['bbox'] for truck in trucks], dtype=np.float64).reshape(-1, 4)
+            in_zone = boxes[self.trucks_in_zone(boxes)]
+        truck_in_zone = len(in_zone) > 0
         truck_touching_line = False
-        
-        for truck in trucks:
-            truck_bbox = truck['bbox']
-            if self.is_truck_in_zone(truck_bbox):
-                truck_in_zone = True
-                if self.is_truck_touching_parking_line(truck_bbox):
-                    truck_touching_line = True
-                    break  # If one truck touches, we're good
+        if truck_in_zone and self.parking_line_points is not None and len(self.parking_line_points) >= 2:
+            # All trucks against the line in one vectorized clip
+            truck_touching_line = bool(boxes_touching_line(in_zone, self.parking_line_points).any())
+        # Reused by _handle_state_change so the notes do not redo the zone and line checks
+        self._last_frame_geom = (truck_in_zone, truck_touching_line)
         
         # Rule 2, 3 & 4: Truck in zone + Touching parking line
         # Counter starts/continues even if human is present (RED state can continue with counter)
@@ -195,7 +265,7 @@ class DockManager:
         """Get remaining wait time in seconds if truck is touching parking line"""
         if self.parking_line_touch_start_time is None:
             return None
-        elapsed = time.time() - self.parking_line_touch_start_time
+        elapsed = time.monotonic() - self.parking_line_touch_start_time
         remaining = max(0, self.wait_time_seconds - elapsed)
         return int(remaining) if remaining > 0 else None
     
@@ -254,50 +324,52 @@ class DockManager:
             except Exception as e:
                 print(f"✗ API call error: {url} - Error: {e}")
         
-        # Call API in background thread to avoid blocking
-        thread = threading.Thread(target=make_request, daemon=True)
-        thread.start()
+        # Call API on a background worker to avoid blocking
+        self._api_pool.submit(make_request)
     
     def _call_dock_status_api(self, vehicle_status, human_presence, dock_status, notes):
         """
-        Call dock status API endpoint with JSON payload in a separate thread (non-blocking)
+        Queue a dock status update for the dock status API (non-blocking)
+        State changes within config.DOCK_STATUS_COALESCE_WINDOW are coalesced; only the latest is posted
         Args:
             vehicle_status: "placed" or "not_placed"
             human_presence: "present" or "not_present"
             dock_status: "RED", "YELLOW", or "GREEN"
             notes: Descriptive notes string
         """
-        def make_request():
+        payload = {
+            "vehicle_status": vehicle_status,
+            "human_presence": human_presence,
+            "dock_status": dock_status,
+            "notes": notes
+        }
+        with self._status_lock:
+            self._pending_status = payload
+            # A flush already scheduled will pick up this payload instead of the older one
+            if self._status_timer is None:
+                self._status_timer = threading.Timer(config.DOCK_STATUS_COALESCE_WINDOW, self._flush_dock_status)
+                self._status_timer.daemon = True
+                self._status_timer.start()
+    
+    def _flush_dock_status(self):
+        """Post the latest queued dock status (runs on the coalescing timer, or from cleanup)"""
+        with self._send_lock:
+            with self._status_lock:
+                payload, self._pending_status = self._pending_status, None
+                self._status_timer = None
+            if payload is None:
+                return
+            
             try:
-                payload = {
-                    "vehicle_status": vehicle_status,
-                    "human_presence": human_presence,
-                    "dock_status": dock_status,
-                    "notes": notes
-                }
-                data = json.dumps(payload).encode('utf-8')
-                
-                request = urllib.request.Request(
-                    config.DOCK_STATUS_API_URL,
-                    data=data,
-                    headers={'Content-Type': 'application/json'},
-                    method='POST'
-                )
-                
-                with urllib.request.urlopen(request, timeout=3) as response:
-                    status_code = response.getcode()
-                    if status_code == 200:
-                        print(f"✓ Dock status API call successful: {vehicle_status}, {human_presence}")
-                    else:
-                        print(f"⚠ Dock status API returned status {status_code}")
-            except urllib.error.URLError as e:
+                response = self._http.post(config.DOCK_STATUS_API_URL, json=payload, timeout=3)
+                if response.status_code == 200:
+                    print(f"✓ Dock status API call successful: {payload['vehicle_status']}, {payload['human_presence']}")
+                else:
+                    print(f"⚠ Dock status API returned status {response.status_code}")
+            except requests.RequestException as e:
                 print(f"✗ Dock status API call failed: {e}")
             except Exception as e:
                 print(f"✗ Dock status API error: {e}")
-        
-        # Call API in background thread to avoid blocking
-        thread = threading.Thread(target=make_request, daemon=True)
-        thread.start()
     
     def _handle_state_change(self, new_state):
         """
@@ -314,22 +386,13 @@ class DockManager:
         # Get detection info for generating notes
         truck_present = False
         human_present = False
-        truck_in_zone = False
-        truck_touching_line = False
         
         if self.last_detection_summary:
             truck_present = self.last_detection_summary.get('truck_present', False)
             human_present = self.last_detection_summary.get('human_present', False)
-            trucks = self.last_detection_summary.get('trucks', [])
-            
-            # Check truck position
-            for truck in trucks:
-                truck_bbox = truck['bbox']
-                if self.is_truck_in_zone(truck_bbox):
-                    truck_in_zone = True
-                    if self.is_truck_touching_parking_line(truck_bbox):
-                        truck_touching_line = True
-                        break
+        
+        # Truck position, as already computed for this frame by determine_state
+        truck_in_zone, truck_touching_line = self._last_frame_geom
         
         # Check if this is a successful parking (GREEN after wait time completed)
         # This happens when: previous state was RED/YELLOW (truck at line, counter running), 
@@ -431,6 +494,14 @@ class DockManager:
         return f"Dock status: {state}"
     
     def cleanup(self):
-        """Cleanup resources, stop PLC manager"""
+        """Cleanup resources, stop API workers and PLC manager"""
+        # Send a status still waiting out the coalescing window now rather than dropping it
+        with self._status_lock:
+            timer = self._status_timer
+        if timer is not None:
+            timer.cancel()
+        self._flush_dock_status()
+        self._api_pool.shutdown(wait=False, cancel_futures=True)
+        self._http.close()
         if self.plc_manager:
             self.plc_manager.stop()
@@ -32,10 +32,13 @@ class PLCManager:
         # We'll handle connection manually
         self.client = ModbusClient(host=self.host, port=self.port)
         
-        # Coil configurations
-        self.green_coils = config.PLC_GREEN_LIGHT_COILS
-        self.red_coils = config.PLC_RED_LIGHT_COILS
-        self.yellow_coils = config.PLC_YELLOW_LIGHT_COILS
+        # Coil configurations - expanded once per state from the configured bitmasks
+        self.state_coils = {
+            "GREEN": config.mask_to_coils(config.PLC_GREEN_LIGHT_MASK),
+            "RED": config.mask_to_coils(config.PLC_RED_LIGHT_MASK),
+            "YELLOW": config.mask_to_coils(config.PLC_YELLOW_LIGHT_MASK),
+        }
+        self.off_coils = config.mask_to_coils(0)  # Unknown state: all lights off
         self.coil_start_address = config.PLC_COIL_START_ADDRESS
         
         # Thread management
@@ -162,20 +165,8 @@ class PLCManager:
             bool: True if successful, False otherwise
         """
         try:
-            coils_to_write = None
-            
-            if state == "GREEN":
-                coils_to_write = self.green_coils
-            elif state == "RED":
-                coils_to_write = self.red_coils
-            elif state == "YELLOW":
-                coils_to_write = self.yellow_coils
-            else:
-                # Unknown state, turn off all lights (all False)
-                coils_to_write = [False] * 8
-            
-            if coils_to_write is None:
-                return False
+            # Unknown state turns off all lights
+            coils_to_write = self.state_coils.get(state, self.off_coils)
             
             # Write coils to PLC
             # pyModbusTCP uses write_multiple_coils(address, values)